@@ -35,6 +35,7 @@ def upgrade():
     # 1. Composite index for replay queries
     # This makes: SELECT * FROM events WHERE attempt_id = X ORDER BY seq
     # go from O(n) table scan to O(log n) index lookup
+    # (seq grows with t, so time-based queries use it too)
     op.create_index(
         'idx_events_attempt_seq',
         'events',
@@ -42,34 +43,25 @@ def upgrade():
         unique=False
     )
     
-    # 2. Index for time-based queries
-    # Useful for: SELECT * FROM events WHERE attempt_id = X AND t <= Y
+    # 2. Covering index for filtering by event type
+    # Useful for analytics: SELECT attempt_id, seq FROM events WHERE type_id = ?
+    # (answered from the index alone, no table lookups; type_id references
+    # event_types, see migration_event_types.py)
     op.create_index(
-        'idx_events_attempt_time',
+        'idx_events_type_id',
         'events',
-        ['attempt_id', 't'],
+        ['type_id', 'attempt_id', 'seq'],
         unique=False
     )
     
-    # 3. Index for filtering by event type
-    # Useful for analytics: SELECT COUNT(*) FROM events WHERE type = 'paste'
-    op.create_index(
-        'idx_events_type',
-        'events',
-        ['type'],
-        unique=False
-    )
-    
-    print(" Added 3 indexes to events table")
+    print(" Added 2 indexes to events table")
     print("   - idx_events_attempt_seq: Fast replay queries")
-    print("   - idx_events_attempt_time: Time-based filtering")
-    print("   - idx_events_type: Event type analytics")
+    print("   - idx_events_type_id: Event type analytics")
 
 
 def downgrade():
     """Remove indexes if needed."""
-    op.drop_index('idx_events_type', table_name='events')
-    op.drop_index('idx_events_attempt_time', table_name='events')
+    op.drop_index('idx_events_type_id', table_name='events')
     op.drop_index('idx_events_attempt_seq', table_name='events')
     
     print(" Removed event indexes")
@@ -18,6 +18,8 @@ class Settings(BaseSettings):
     OLLAMA_API_URL: str = "https://chatucy.cs.ucy.ac.cy/ollama/v1/chat/completions"
     OLLAMA_BASE_URL: str = "https://chatucy.cs.ucy.ac.cy/ollama/v1"
     OLLAMA_API_KEY: str = ""
+    # Small model for short, high-volume outputs (e.g. tracing feedback)
+    FEEDBACK_MODEL: str = "qwen2.5-0.5b"
     
     # CORS
     CORS_ORIGINS: str = "http://localhost:3000,http://localhost:5173"
@@ -27,11 +29,21 @@ class Settings(BaseSettings):
     
     # Execution Queue (Phase 1: in-process)
     MAX_CONCURRENT_EXECUTIONS: int = 4
+    EXECUTION_WORKERS: int = 2  # in-process workers, one queue shard each
     QUEUE_MAX_SIZE: int = 200
     EXECUTION_TIMEOUT: int = 30  # seconds
     BUILD_TIMEOUT: int = 120  # seconds
     RUN_ENQUEUE_THROTTLE: int = 2  # seconds between enqueues per attempt
     SNAPSHOT_SIZE_THRESHOLD: int = 262144  # 256KB in bytes
+    WORK_TMPFS: str = ""  # parent dir for run work dirs, e.g. /dev/shm (empty = system temp)
+    WORK_DIR_POOL_SIZE: int = 4  # idle work dirs kept per language
+    MAX_OUTPUT_BYTES: int = 1048576  # per stream; longer stdout/stderr is truncated
+    CGROUP_ROOT: str = ""  # delegated cgroup v2 dir (e.g. /sys/fs/cgroup/cognicode) for host runs; empty = off
+    WARM_CONTAINERS_PER_LANG: int = 0  # >0: run inside pooled Docker containers via docker exec
+    SNAPSHOT_DIR: str = "./snapshots"  # content-addressed run snapshots (<dir>/<hash[:2]>/<hash>)
+    RUN_CACHE_SIZE: int = 0  # >0: cache results of unchanged re-runs (only for deterministic programs)
+    RUN_CACHE_TTL: int = 300  # seconds
+    MAX_EVENT_TYPES: int = 64  # distinct events.type names before new ones are rejected
     
     # Redis (Phase 2: for distributed queue)
     REDIS_HOST: str = "localhost"
@@ -39,6 +51,8 @@ class Settings(BaseSettings):
     REDIS_DB: int = 0
     REDIS_PASSWORD: str = ""
     QUEUE_BACKEND: str = "in-process"  # "in-process" or "redis"
+    REDIS_QUEUE_MAX_DEPTH: int = 50  # pending + running ARQ jobs before enqueues get 429
+    RUN_RETRY_AFTER: int = 5  # seconds, Retry-After on a 429 from a full queue
     
     @property
     def REDIS_URL(self) -> str:
@@ -1,10 +1,12 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import logging
 from app.config import settings
 from app.database import init_db
 from app.services.execution_queue import get_queue_manager
+from app.services.executor_service import ExecutorService
 from app.routers import auth, assignments, events, ai, replay, teacher_settings, techniques, tasks
 from app.routers import execute
 
@@ -31,8 +33,12 @@ async def lifespan(app: FastAPI):
             logger.error(f"Failed to connect to Redis: {e}. Make sure Redis is running.")
     else:
         logger.info("Using in-process queue backend (Phase 1)")
+        ExecutorService.prefill_work_dirs()
+        if settings.WARM_CONTAINERS_PER_LANG > 0:
+            await ExecutorService.start_container_pool()
+            logger.info(f"Started {settings.WARM_CONTAINERS_PER_LANG} warm containers per language")
         queue_manager = get_queue_manager()
-        await queue_manager.start_workers(num_workers=2)
+        await queue_manager.start_workers(num_workers=settings.EXECUTION_WORKERS)
         logger.info("Execution queue workers started")
     
     yield
@@ -43,6 +49,7 @@ async def lifespan(app: FastAPI):
         queue_manager = get_queue_manager()
         await queue_manager.shutdown()
         logger.info("Execution queue workers stopped")
+        await ExecutorService.stop_container_pool()
     logger.info("COGNICODE API shut down complete")
 
 
@@ -51,7 +58,8 @@ app = FastAPI(
     title="COGNICODE API",
     description="Educational coding platform with AI assistance and session replay",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
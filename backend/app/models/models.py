@@ -1,7 +1,11 @@
 from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Float, Enum as SQLEnum, Index
+from sqlalchemy import LargeBinary, SmallInteger, text
+from sqlalchemy.types import TypeDecorator
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
+import threading
+import zstandard
 from app.database import Base
 
 
@@ -102,6 +106,14 @@ class Attempt(Base):
     runs = relationship("Run", back_populates="attempt", cascade="all, delete-orphan")
 
 
+class EventType(Base):
+    """Dictionary of event type names; events store the integer id instead of the string."""
+    __tablename__ = "event_types"
+    
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50), unique=True, nullable=False)  # edit, cursor, paste, run, ai_prompt, ai_response
+
+
 class Event(Base):
     __tablename__ = "events"
     
@@ -109,28 +121,40 @@ class Event(Base):
     attempt_id = Column(Integer, ForeignKey("attempts.id"), nullable=False)
     t = Column(Float, nullable=False)  # timestamp in seconds since attempt start
     seq = Column(Integer, nullable=False)  # sequence number
-    type = Column(String(50), nullable=False)  # edit, cursor, paste, run, ai_prompt, ai_response
+    type_id = Column(Integer, ForeignKey("event_types.id"), nullable=False)  # see event_type_service
     file_path = Column(String(500), nullable=True)  # NEW: For multi-file project support
     payload_json = Column(Text, nullable=False)  # JSON string
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
     attempt = relationship("Attempt", back_populates="events")
+    event_type = relationship("EventType", lazy="joined")
+    
+    @property
+    def type(self) -> str:
+        """Event type name (edit, paste, ...)."""
+        return self.event_type.name
     
     # Performance indexes - CRITICAL for fast replay queries
     __table_args__ = (
         # Composite index for replay: SELECT * FROM events WHERE attempt_id = X ORDER BY seq
         # This makes replay queries 10-100 faster (index scan vs full table scan)
+        # seq grows with t within an attempt, so it also serves time-ordered reads
         Index('idx_events_attempt_seq', 'attempt_id', 'seq'),
         
-        # Index for time-based queries: WHERE attempt_id = X AND t <= Y
-        Index('idx_events_attempt_time', 'attempt_id', 't'),
-        
-        # Index for event type filtering: WHERE type = 'paste'
-        Index('idx_events_type', 'type'),
+        # Covering index for event type filtering: WHERE type_id = X [AND attempt_id = Y] ORDER BY seq
+        Index('idx_events_type_id', 'type_id', 'attempt_id', 'seq'),
         
         # Index for multi-file queries: WHERE attempt_id = X AND file_path = 'src/main.py'
-        Index('idx_events_file', 'file_path'),
+        # Partial: legacy and single-file rows have file_path NULL and are left out
+        Index(
+            'idx_events_file', 'file_path', 'attempt_id', 'seq',
+            sqlite_where=text('file_path IS NOT NULL'),
+            postgresql_where=text('file_path IS NOT NULL'),
+        ),
+        
+        # Covering index for metrics: per-type counts and edit gaps ordered by seq
+        Index('idx_events_attempt_type_seq', 'attempt_id', 'type_id', 'seq', 't'),
     )
 
 
@@ -162,6 +186,89 @@ class RunStatus(str, enum.Enum):
     CANCELLED = "cancelled"
 
 
+class RunStatusCode(enum.IntEnum):
+    """Storage code for each RunStatus (runs.status is a SMALLINT)."""
+    QUEUED = 0
+    RUNNING = 1
+    SUCCESS = 2
+    ERROR = 3
+    TIMEOUT = 4
+    COMPILATION_ERROR = 5
+    CANCELLED = 6
+
+
+class RunStatusType(TypeDecorator):
+    """Maps RunStatus to its RunStatusCode in a SMALLINT column."""
+    impl = SmallInteger
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return int(RunStatusCode[RunStatus(value).name])
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, str) and not value.isdigit():
+            return RunStatus[value.upper()]  # Row not yet converted by revision 004 (name or value)
+        return RunStatus[RunStatusCode(int(value)).name]
+
+
+_zstd_local = threading.local()
+
+
+def _zstd_contexts():
+    """Per-thread zstd (de)compressor; the contexts are not thread-safe."""
+    if not hasattr(_zstd_local, 'cctx'):
+        _zstd_local.cctx = zstandard.ZstdCompressor(level=3)
+        _zstd_local.dctx = zstandard.ZstdDecompressor()
+    return _zstd_local.cctx, _zstd_local.dctx
+
+
+_ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'  # Start of every zstd frame
+
+
+class ZstdText(TypeDecorator):
+    """Text stored zstd-compressed (level 3) in a BLOB column."""
+    impl = LargeBinary
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        cctx, _ = _zstd_contexts()
+        return cctx.compress(value.encode('utf-8'))
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, str):
+            return value  # Row written while the column was TEXT
+        if not value.startswith(_ZSTD_MAGIC):
+            return value.decode('utf-8')  # TEXT row converted to its UTF-8 bytes by revision 004
+        _, dctx = _zstd_contexts()
+        return dctx.decompress(value).decode('utf-8')
+
+
+class HexDigest(TypeDecorator):
+    """Hex digest string stored as raw bytes (half the size of the hex text)."""
+    impl = LargeBinary
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return bytes.fromhex(value)
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, str):
+            return value  # Row written while the column held hex text
+        return value.hex()
+
+
 class Run(Base):
     __tablename__ = "runs"
     
@@ -169,14 +276,14 @@ class Run(Base):
     attempt_id = Column(Integer, ForeignKey("attempts.id"), nullable=False, index=True)
     
     # Job state
-    status = Column(SQLEnum(RunStatus), nullable=False, default=RunStatus.QUEUED, index=True)
+    status = Column(RunStatusType(), nullable=False, default=RunStatus.QUEUED, index=True)
     created_at = Column(DateTime, default=datetime.utcnow, index=True)
     started_at = Column(DateTime, nullable=True)
     finished_at = Column(DateTime, nullable=True)
     
     # Build phase output
-    build_stdout = Column(Text, nullable=True)
-    build_stderr = Column(Text, nullable=True)
+    build_stdout = Column(ZstdText(), nullable=True)  # Compiler output is very repetitive
+    build_stderr = Column(ZstdText(), nullable=True)
     build_exit_code = Column(Integer, nullable=True)
     build_time = Column(Float, nullable=True)
     
@@ -187,17 +294,24 @@ class Run(Base):
     run_time = Column(Float, nullable=True)  # execution time in seconds
     
     # Snapshots & metadata
-    code_snapshot = Column(Text, nullable=True)  # Full code snapshot if ≤256KB
-    snapshot_hash = Column(String(64), nullable=True)  # SHA256 of files
-    request_json = Column(Text, nullable=True)  # Full request payload for reproducibility
+    code_snapshot = Column(Text, nullable=True)  # Legacy inline snapshot; new runs use SNAPSHOT_DIR/<hash>
+    snapshot_hash = Column(HexDigest(16), nullable=True)  # 128-bit BLAKE3 (SHA256 fallback) of files
+    request_json = Column(ZstdText(), nullable=True)  # Full request payload for reproducibility
     
     # Relationships
     attempt = relationship("Attempt", back_populates="runs")
     
     # Performance indexes
     __table_args__ = (
-        Index('idx_runs_attempt_status', 'attempt_id', 'status'),
-        Index('idx_runs_created', 'created_at'),
+        # Queue lookups: WHERE attempt_id = X AND status = Y ORDER BY created_at
+        Index('idx_runs_attempt_status_created', 'attempt_id', 'status', 'created_at'),
+        
+        # Runs of identical files; partial because legacy rows have no hash
+        Index(
+            'idx_runs_snapshot_hash', 'snapshot_hash',
+            sqlite_where=text('snapshot_hash IS NOT NULL'),
+            postgresql_where=text('snapshot_hash IS NOT NULL'),
+        ),
     )
 
 
@@ -31,12 +31,13 @@ async def chat(
     current_user: User = Depends(get_current_user)
 ):
     """Proxy chat request to Ollama and log the interaction."""
-    logger.info(f" AI Chat Request - User: {current_user.username}, Model: {request.model}, Attempt: {attempt_id}")
+    logger.info(" AI Chat Request - User: %s, Model: %s, Attempt: %s", current_user.username, request.model, attempt_id)
     
     try:
         # Log request details
-        logger.info(f"Calling Ollama API with model: {request.model}, temperature: {request.temperature}, max_tokens: {request.max_tokens}")
-        logger.debug(f"Ollama API request messages: {json.dumps([msg.model_dump() for msg in request.messages], ensure_ascii=False)}")
+        logger.info("Calling Ollama API with model: %s, temperature: %s, max_tokens: %s", request.model, request.temperature, request.max_tokens)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Ollama API request messages: %s", json.dumps([msg.model_dump() for msg in request.messages], ensure_ascii=False))
 
         response_data = await ollama_service.chat_completion(
             messages=[msg.model_dump() for msg in request.messages],
@@ -45,12 +46,13 @@ async def chat(
             max_tokens=request.max_tokens
         )
 
-        logger.info(f"Ollama API response received successfully")
-        logger.debug(f"Ollama API response: {json.dumps(response_data, ensure_ascii=False)}")
+        logger.info("Ollama API response received successfully")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Ollama API response: %s", json.dumps(response_data, ensure_ascii=False))
 
         # Log interaction if attempt_id provided
         if attempt_id:
-            logger.info(f"Logging interaction to database for attempt_id: {attempt_id}")
+            logger.info("Logging interaction to database for attempt_id: %s", attempt_id)
             # Verify attempt exists and belongs to user
             result = await db.execute(select(Attempt).where(Attempt.id == attempt_id))
             attempt = result.scalar_one_or_none()
@@ -80,16 +82,16 @@ async def chat(
 
                 db.add(interaction)
                 await db.commit()
-                logger.info(f"AI interaction logged successfully for attempt {attempt_id}")
+                logger.info("AI interaction logged successfully for attempt %s", attempt_id)
             else:
-                logger.warning(f"Attempt {attempt_id} not found or doesn't belong to user {current_user.username}")
+                logger.warning("Attempt %s not found or doesn't belong to user %s", attempt_id, current_user.username)
 
         return response_data
 
     except Exception as e:
-        logger.error(f"AI service error: {str(e)}", exc_info=True)
-        logger.error(f"Request model: {request.model}, temperature: {request.temperature}, max_tokens: {request.max_tokens}")
-        logger.error(f"Request messages: {json.dumps([msg.model_dump() for msg in request.messages], ensure_ascii=False)}")
+        logger.error("AI service error: %s", e, exc_info=True)
+        logger.error("Request model: %s, temperature: %s, max_tokens: %s", request.model, request.temperature, request.max_tokens)
+        logger.error("Request messages: %s", json.dumps([msg.model_dump() for msg in request.messages], ensure_ascii=False))
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"AI service error: {str(e)}"
@@ -140,7 +142,7 @@ async def lead_and_reveal(
     attempt_id = request.get("attempt_id")
     model = request.get("model", "mistral")
     
-    ai_log.info(f" Lead-and-Reveal Request - User: {current_user.username}, Model: {model}")
+    ai_log.info(" Lead-and-Reveal Request - User: %s, Model: %s", current_user.username, model)
     result = await db.execute(select(Attempt).where(Attempt.id == attempt_id))
     attempt = result.scalar_one_or_none()
     if not attempt or attempt.user_id != current_user.id:
@@ -148,7 +150,7 @@ async def lead_and_reveal(
     prompt = f"Lead-and-Reveal: {problem}"
     
     try:
-        ai_log.info(f"[DEBUG] Using pre-patched ollama_client for Lead-and-Reveal")
+        ai_log.info("[DEBUG] Using pre-patched ollama_client for Lead-and-Reveal")
         response = await ollama_client.chat.completions.create(
             model=model,
             response_model=LeadAndRevealResponse,
@@ -176,7 +178,7 @@ Each step must have exactly these 4 fields. Generate 5-8 steps total."""},
             timeout=30.0
         )
     except Exception as e:
-        ai_log.error(f"[ERROR] Exception during lead-and-reveal: {str(e)}", exc_info=True)
+        ai_log.error("[ERROR] Exception during lead-and-reveal: %s", e, exc_info=True)
         raise
     
     interaction = AIInteraction(
@@ -189,7 +191,7 @@ Each step must have exactly these 4 fields. Generate 5-8 steps total."""},
     )
     db.add(interaction)
     await db.commit()
-    ai_log.info(f" Logged Lead-and-Reveal interaction for attempt {attempt_id}")
+    ai_log.info(" Logged Lead-and-Reveal interaction for attempt %s", attempt_id)
     return response
 
 
@@ -203,7 +205,7 @@ async def trace_and_predict(
     attempt_id = request.get("attempt_id")
     model = request.get("model", "mistral")
     
-    ai_log.info(f" Trace-and-Predict Request - User: {current_user.username}, Model: {model}")
+    ai_log.info(" Trace-and-Predict Request - User: %s, Model: %s", current_user.username, model)
     result = await db.execute(select(Attempt).where(Attempt.id == attempt_id))
     attempt = result.scalar_one_or_none()
     if not attempt or attempt.user_id != current_user.id:
@@ -211,7 +213,7 @@ async def trace_and_predict(
     prompt = f"Trace-and-Predict: {code[:200]}..."
     
     try:
-        ai_log.info(f"[DEBUG] Using pre-patched ollama_client for Trace-and-Predict")
+        ai_log.info("[DEBUG] Using pre-patched ollama_client for Trace-and-Predict")
         response = await ollama_client.chat.completions.create(
             model=model,
             response_model=TraceAndPredictResponse,
@@ -239,7 +241,7 @@ Each step must have exactly these 4 fields. Generate 3-15 steps total."""},
             timeout=30.0
         )
     except Exception as e:
-        ai_log.error(f"[ERROR] Exception during trace-and-predict: {str(e)}", exc_info=True)
+        ai_log.error("[ERROR] Exception during trace-and-predict: %s", e, exc_info=True)
         raise
     
     interaction = AIInteraction(
@@ -252,7 +254,7 @@ Each step must have exactly these 4 fields. Generate 3-15 steps total."""},
     )
     db.add(interaction)
     await db.commit()
-    ai_log.info(f" Logged Trace-and-Predict interaction for attempt {attempt_id}")
+    ai_log.info(" Logged Trace-and-Predict interaction for attempt %s", attempt_id)
     return response
 
 
@@ -266,7 +268,7 @@ async def parsons_problem(
     attempt_id = request.get("attempt_id")
     model = request.get("model", "mistral")
     
-    ai_log.info(f" Parsons Problem Request - User: {current_user.username}, Model: {model}")
+    ai_log.info(" Parsons Problem Request - User: %s, Model: %s", current_user.username, model)
     
     result = await db.execute(select(Attempt).where(Attempt.id == attempt_id))
     attempt = result.scalar_one_or_none()
@@ -275,7 +277,7 @@ async def parsons_problem(
     prompt = f"Parsons: {problem}"
     
     try:
-        ai_log.info(f"[DEBUG] Using pre-patched ollama_client for Parsons")
+        ai_log.info("[DEBUG] Using pre-patched ollama_client for Parsons")
         response = await ollama_client.chat.completions.create(
             model=model,
             response_model=ParsonsResponse,
@@ -306,7 +308,7 @@ Generate 5-10 blocks total, with 1-2 distractors."""},
             timeout=30.0
         )
     except Exception as e:
-        ai_log.error(f"[ERROR] Exception during parsons problem: {str(e)}", exc_info=True)
+        ai_log.error("[ERROR] Exception during parsons problem: %s", e, exc_info=True)
         raise
     interaction = AIInteraction(
         attempt_id=attempt_id,
@@ -318,5 +320,5 @@ Generate 5-10 blocks total, with 1-2 distractors."""},
     )
     db.add(interaction)
     await db.commit()
-    ai_log.info(f" Logged Parsons problem for attempt {attempt_id}")
+    ai_log.info(" Logged Parsons problem for attempt %s", attempt_id)
     return response
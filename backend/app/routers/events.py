@@ -1,3 +1,4 @@
+import json
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
@@ -12,6 +13,7 @@ from app.schemas.schemas import (
     EventResponse
 )
 from app.auth_utils import get_current_user
+from app.services.event_type_service import event_type_service
 
 router = APIRouter(prefix="/api", tags=["Attempts & Events"])
 
@@ -189,7 +191,6 @@ async def save_attempt(
         attempt.final_code = code_data["files"]
     else:
         # Fallback: entire payload is the code
-        import json
         attempt.final_code = json.dumps(code_data)
     
     await db.commit()
@@ -221,13 +222,20 @@ async def log_events(
             detail="Access denied"
         )
     
-    # Create events
+    # Create events (types are stored as event_types ids)
+    try:
+        type_ids = await event_type_service.get_ids(db, (event_data.type for event_data in event_batch.events))
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
     for event_data in event_batch.events:
         event = Event(
             attempt_id=event_batch.attempt_id,
             t=event_data.t,
             seq=event_data.seq,
-            type=event_data.type,
+            type_id=type_ids[event_data.type],
             file_path=event_data.file_path,  # NEW: Support multi-file projects
             payload_json=event_data.payload_json
         )
@@ -16,11 +16,12 @@ Design:
 - Client polls for results
 - All outputs persisted for replay/analytics
 """
-import json
-import hashlib
 import logging
+import orjson
 from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse
+from arq.constants import default_queue_name
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.auth_utils import get_current_user
@@ -30,6 +31,7 @@ from app.schemas.execute_schemas import (
     ExecuteRequest, ExecuteEnqueueResponse, ExecuteResultResponse, ExecuteErrorResponse
 )
 from app.services.execution_queue import get_queue_manager, get_redis_pool
+from app.services.snapshot_service import build_snapshot
 from app.config import settings
 
 router = APIRouter(prefix="/api/execute", tags=["Execution"])
@@ -51,7 +53,7 @@ async def enqueue_execution(
     Status codes:
     - 202: Job enqueued successfully
     - 409: Run already in progress for this attempt (strict lock)
-    - 429: Too many recent runs for this attempt (throttle)
+    - 429: Too many recent runs for this attempt (throttle), or Redis queue too deep
     - 503: Queue overloaded
     - 400: Invalid request
     """
@@ -94,6 +96,17 @@ async def enqueue_execution(
                 detail=f"Please wait {settings.RUN_ENQUEUE_THROTTLE}s between runs"
             )
     
+    # Back-pressure (Phase 2): ARQ keeps jobs in its queue zset until they finish,
+    # so its size is pending + running. Refuse before creating the Run row.
+    if settings.QUEUE_BACKEND == "redis":
+        redis = await get_redis_pool()
+        if await redis.zcard(default_queue_name) >= settings.REDIS_QUEUE_MAX_DEPTH:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Execution queue is busy, please retry shortly",
+                headers={"Retry-After": str(settings.RUN_RETRY_AFTER)}
+            )
+    
     # Create Run record with queued status
     new_run = Run(
         attempt_id=request.attempt_id,
@@ -116,18 +129,10 @@ async def enqueue_execution(
     }
     
     # Store request JSON for reproducibility
-    new_run.request_json = json.dumps(payload)
+    new_run.request_json = orjson.dumps(payload).decode('utf-8')
     
-    # Compute snapshot hash
-    files_json = json.dumps(
-        [{'name': f.name, 'path': f.path, 'content': f.content} for f in request.files]
-    )
-    new_run.snapshot_hash = hashlib.sha256(files_json.encode()).hexdigest()
-    
-    # Store full snapshot if under size threshold
-    snapshot_size = len(files_json.encode('utf-8'))
-    if snapshot_size <= settings.SNAPSHOT_SIZE_THRESHOLD:
-        new_run.code_snapshot = files_json
+    # Compute snapshot hash only; the worker writes the snapshot to the file store
+    new_run.snapshot_hash, _, _ = build_snapshot(payload['files'], 0)
     
     await db.commit()
     
@@ -149,7 +154,9 @@ async def enqueue_execution(
     else:
         # Phase 1: In-process
         queue_manager = get_queue_manager()
-        success, message = await queue_manager.enqueue_job(run_id, payload)
+        success, message = await queue_manager.enqueue_job(
+            run_id, payload, snapshot_hash=new_run.snapshot_hash
+        )
         
         if not success:
             # If enqueue failed, mark run as error
@@ -210,7 +217,7 @@ async def get_execution_result(
     if run.finished_at and run.started_at:
         total_time = (run.finished_at - run.started_at).total_seconds()
     
-    return ExecuteResultResponse(
+    result = ExecuteResultResponse(
         run_id=run.id,
         attempt_id=run.attempt_id,
         status=run.status.value,
@@ -229,4 +236,8 @@ async def get_execution_result(
         finished_at=run.finished_at,
         total_time=total_time
     )
+    
+    # Clients poll this every ~500ms: return the already-validated model as a
+    # Response so FastAPI skips re-validating it against response_model.
+    return ORJSONResponse(result.model_dump(mode="json"))
 
@@ -36,15 +36,14 @@ async def get_replay_metrics(
     current_user: User = Depends(get_current_teacher)
 ):
     """Get engagement metrics for an attempt (teachers only)."""
-    replay_data = await replay_service.get_replay_data(attempt_id, db)
+    metrics = await replay_service.get_metrics(attempt_id, db)
     
-    if not replay_data:
+    if metrics is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Attempt not found"
         )
     
-    metrics = replay_service.calculate_metrics(replay_data["events"])
     return metrics
 
 
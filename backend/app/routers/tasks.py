@@ -17,6 +17,7 @@ from app.models.models import (
 )
 from app.auth_utils import get_current_user
 from app.services.ai_proxy import ollama_service
+from app.services.event_type_service import event_type_service
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/api/tasks", tags=["Task Orchestration"])
@@ -74,7 +75,7 @@ async def get_next_task(
     Student selected their preferred technique from the modal.
     This endpoint confirms it's valid for the assignment.
     """
-    logger.info(f" Validating technique - User: {current_user.username}, Chosen: {request.chosen_technique}")
+    logger.info(" Validating technique - User: %s, Chosen: %s", current_user.username, request.chosen_technique)
     
     if current_user.role.value != "Student":
         raise HTTPException(
@@ -100,7 +101,7 @@ async def get_next_task(
             detail=f"Invalid technique. Must be one of: {', '.join(valid_techniques)}"
         )
     
-    logger.info(f" Student {current_user.username} chose technique: {request.chosen_technique}")
+    logger.info(" Student %s chose technique: %s", current_user.username, request.chosen_technique)
     
     return TaskAssignmentResponse(
         status="valid",
@@ -120,7 +121,7 @@ async def request_hint(
     Request the next tier of hint for current task.
     Level 1  Level 2  Level 3 (solution).
     """
-    logger.info(f" Hint request - User: {current_user.username}, Attempt: {attempt_id}")
+    logger.info(" Hint request - User: %s, Attempt: %s", current_user.username, attempt_id)
     
     # Verify attempt belongs to user
     result = await db.execute(select(Attempt).where(Attempt.id == attempt_id))
@@ -168,14 +169,15 @@ async def request_hint(
     
     await db.commit()
     
-    logger.info(f" Returned hint level {next_level} for attempt {attempt_id}")
+    logger.info(" Returned hint level %s for attempt %s", next_level, attempt_id)
     
     # Log hint request as event
+    type_ids = await event_type_service.get_ids(db, ["hint_requested"])
     event = Event(
         attempt_id=attempt_id,
         t=0,  # Will be set by frontend
         seq=0,  # Will be set by frontend
-        type="hint_requested",
+        type_id=type_ids["hint_requested"],
         payload_json=f'{{"level": {next_level}, "technique": "{hint_level.technique.value}"}}'
     )
     db.add(event)
@@ -198,7 +200,7 @@ async def submit_task(
     Submit a completed task.
     Student finishes their attempt and can choose a different technique for the next attempt.
     """
-    logger.info(f" Task submission - User: {current_user.username}, Attempt: {request.attempt_id}")
+    logger.info(" Task submission - User: %s, Attempt: %s", current_user.username, request.attempt_id)
     
     # Verify attempt belongs to user
     result = await db.execute(select(Attempt).where(Attempt.id == request.attempt_id))
@@ -216,18 +218,19 @@ async def submit_task(
     attempt.total_score = request.score
     
     # Log submission
+    type_ids = await event_type_service.get_ids(db, ["task_submitted"])
     event = Event(
         attempt_id=request.attempt_id,
         t=0,
         seq=0,
-        type="task_submitted",
+        type_id=type_ids["task_submitted"],
         payload_json=f'{{"score": {request.score}, "notes": "{request.notes or ""}"}}'
     )
     db.add(event)
     
     await db.commit()
     
-    logger.info(f" Attempt {request.attempt_id} submitted with score {request.score}")
+    logger.info(" Attempt %s submitted with score %s", request.attempt_id, request.score)
     
     return {"status": "submitted", "attempt_id": request.attempt_id}
 
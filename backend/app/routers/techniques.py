@@ -10,6 +10,7 @@ import json
 import logging
 
 from app.auth_utils import get_current_user
+from app.config import settings
 from app.models.models import User
 from app.services.ai_proxy import ollama_service
 
@@ -93,7 +94,7 @@ async def baseline_generate_feedback(
     Compare student prompt with task descriptions. Score accuracy and extract missing specs.
     Ported from codex-baseline-router.ts:/generateFeedback
     """
-    logger.info(f" Baseline generateFeedback - User: {current_user.username}")
+    logger.info(" Baseline generateFeedback - User: %s", current_user.username)
     
     system_prompt = """
 Given a set of tasks descriptions, compare the specifications provided in the [student-prompt] with the [task-descriptions]. 
@@ -134,14 +135,14 @@ Use the following JSON template:
         )
         
         response_text = response.get("choices", [{}])[0].get("message", {}).get("content", "")
-        logger.info(f" Baseline feedback generated")
+        logger.info(" Baseline feedback generated")
         
         # Parse JSON response
         result = json.loads(response_text)
         return GenerateFeedbackResponse(**result)
     
     except Exception as e:
-        logger.error(f" Baseline generateFeedback error: {str(e)}", exc_info=True)
+        logger.error(" Baseline generateFeedback error: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Feedback generation failed: {str(e)}"
@@ -157,7 +158,7 @@ async def baseline_generate(
     Generate Python code with line-by-line explanations for a problem description.
     Ported from codex-baseline-router.ts:/generate
     """
-    logger.info(f" Baseline generate - User: {current_user.username}")
+    logger.info(" Baseline generate - User: %s", current_user.username)
     
     system_prompt = """Generate the python code that solves the provided problem. Use the following format to provide explanations for each line.
 
@@ -185,7 +186,7 @@ async def baseline_generate(
         )
         
         response_text = response.get("choices", [{}])[0].get("message", {}).get("content", "")
-        logger.info(f" Baseline code generated")
+        logger.info(" Baseline code generated")
         
         # Split into code and explanation
         end_code_index = response_text.find("[END]")
@@ -197,7 +198,7 @@ async def baseline_generate(
             return CodeWithLineResponse(code=response_text, explain="")
     
     except Exception as e:
-        logger.error(f" Baseline generate error: {str(e)}", exc_info=True)
+        logger.error(" Baseline generate error: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Code generation failed: {str(e)}"
@@ -213,7 +214,7 @@ async def baseline_generate_code(
     Generate Python code snippets for intended behaviors with optional context.
     Ported from codex-baseline-router.ts:/generatecode
     """
-    logger.info(f" Baseline generatecode - User: {current_user.username}")
+    logger.info(" Baseline generatecode - User: %s", current_user.username)
     
     system_prompt = "for each provided [intended-behavior] generate python [code] snippets"
     
@@ -250,12 +251,12 @@ async def baseline_generate_code(
         )
         
         code = response.get("choices", [{}])[0].get("message", {}).get("content", "")
-        logger.info(f" Baseline code snippet generated")
+        logger.info(" Baseline code snippet generated")
         
         return {"code": code, "success": True}
     
     except Exception as e:
-        logger.error(f" Baseline generatecode error: {str(e)}", exc_info=True)
+        logger.error(" Baseline generatecode error: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Code snippet generation failed: {str(e)}"
@@ -284,7 +285,7 @@ async def reveal_generate_question(
     Break code into subgoals and generate MCQ questions for lead-and-reveal learning.
     Ported from codex-reveal-router.ts:/generateQuestion
     """
-    logger.info(f" Reveal generateQuestion - User: {current_user.username}")
+    logger.info(" Reveal generateQuestion - User: %s", current_user.username)
     
     system_prompt = """# Overview:
 you are helping novice programmers learn about coding. Look at the provided Python [solution-code] and the [task-description], then divide the provided code into a list of [subgoal] items. For each [subgoal], provide a concise [title] and then divide it into [sub-subgoal-items]. The student has only be given the [task-description] and cannot see the [solution-code], instead you, the assistant that is helping this novice student learn about coding by asking a series of leading questions. These leading questions are multiple-choice question about each sub-subgoal parts of the task.
@@ -332,14 +333,14 @@ you are helping novice programmers learn about coding. Look at the provided Pyth
         )
         
         response_text = response.get("choices", [{}])[0].get("message", {}).get("content", "")
-        logger.info(f" Reveal questions generated")
+        logger.info(" Reveal questions generated")
         
         # Parse JSON response
         result = json.loads(response_text)
         return RevealGenerateQuestionResponse(**result)
     
     except Exception as e:
-        logger.error(f" Reveal generateQuestion error: {str(e)}", exc_info=True)
+        logger.error(" Reveal generateQuestion error: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Question generation failed: {str(e)}"
@@ -359,7 +360,7 @@ async def reveal_feedback_from_short_answer(
     Grade student's short answer to a reveal question and provide feedback.
     Ported from codex-reveal-router.ts:/feedbackFromRevealShortAnswer
     """
-    logger.info(f" Reveal feedback - User: {current_user.username}")
+    logger.info(" Reveal feedback - User: %s", current_user.username)
     
     system_prompt = """I have been asked this [question] about the next part of the [not-revealed-code] that I haven't seen yet (so it's hidden to me). This is part of an exercise to help me think deeply about what this [not-revealed-code] is supposed to do and how it contributes to the [overall-code-solution]. Here is my [my-answer] to the [question]. Check if it makes sense based on the [overall-code-solution], [not-revealed-code], and the [sample-solution]
 
@@ -388,13 +389,13 @@ Please return a JSON object with the following format:
         )
         
         response_text = response.get("choices", [{}])[0].get("message", {}).get("content", "")
-        logger.info(f" Reveal feedback generated")
+        logger.info(" Reveal feedback generated")
         
         result = json.loads(response_text)
         return {"response": result, "success": True}
     
     except Exception as e:
-        logger.error(f" Reveal feedback error: {str(e)}", exc_info=True)
+        logger.error(" Reveal feedback error: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Feedback generation failed: {str(e)}"
@@ -415,9 +416,9 @@ async def tracing_lines_to_rewrite(
     Analyze code and context, return rewritten code with {new}, {old} markers.
     Ported from codex-tracing-router.ts:/linesToRewrite
     """
-    logger.info(f" Tracing linesToRewrite - User: {current_user.username}")
+    logger.info(" Tracing linesToRewrite - User: %s", current_user.username)
     
-    system_prompt = """given the below instructions, check if the code need to be rewritten for the given user's goal {prompt}, write out the correct implementation of the python code for novice Python learners. The format of the print out should be one of the following structures: {old}{new}{old}, {old1}{new}, or {new}{old}, or {new}. No exceptions, there can only be one {new} block. {old} are the part of the logic and code that is correct and do not need to be changed, {new} are the code that are newly generated or fixed. If the {context} are wrong, the fix of the {new} code should still follow the context's logic. The {new} code should be a whole excutable code."""
+    system_prompt = """given the below instructions, check if the code need to be rewritten for the given user's goal {prompt}, write out the correct implementation of the python code for novice Python learners. The format of the print out should be one of the following structures: {old}{new}{old}, {old1}{new}, or {new}{old}, or {new}. No exceptions, there can only be one {new} block. {old} are the part of the logic and code that is correct and do not need to be changed, {new} are the code that are newly generated or fixed. If the {context} are wrong, the fix of the {new} code should still follow the context's logic. The {new} code should be a whole excutable code. Write {end} once the rewritten code is complete."""
     
     user_message = f"{{code}}:{code}\n{{context}}:{context}"
     
@@ -429,16 +430,17 @@ async def tracing_lines_to_rewrite(
             ],
             model="phi-3-mini",
             temperature=0.3,
-            max_tokens=1000
+            max_tokens=1000,
+            stop=["{end}", "</code>"]
         )
         
         result_text = response.get("choices", [{}])[0].get("message", {}).get("content", "")
-        logger.info(f" Tracing lines rewritten")
+        logger.info(" Tracing lines rewritten")
         
         return {"result": result_text, "success": True}
     
     except Exception as e:
-        logger.error(f" Tracing linesToRewrite error: {str(e)}", exc_info=True)
+        logger.error(" Tracing linesToRewrite error: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Rewriting failed: {str(e)}"
@@ -455,7 +457,7 @@ async def tracing_generate_question(
     Generate tracing questions about variable changes.
     Ported from codex-tracing-router.ts:/generateQuestion
     """
-    logger.info(f" Tracing generateQuestion - User: {current_user.username}")
+    logger.info(" Tracing generateQuestion - User: %s", current_user.username)
     
     system_prompt = """Given the code snippet in python, the goal for showing these code is for novice python programmer to understand the changes of variables when tracing the code. By the given {excutionsteps} and {code}, generate a list of questions {step, variable} regarding the next value for tracing steps. for each question, generate the step number and trace step number. Only ask meaningful questions, for example, changes of object that will change value in each step. ask 2-3 questions per code snippet. Make sure do not include any questions involving the user input or random."""
     
@@ -474,12 +476,12 @@ async def tracing_generate_question(
         )
         
         result_text = response.get("choices", [{}])[0].get("message", {}).get("content", "")
-        logger.info(f" Tracing questions generated")
+        logger.info(" Tracing questions generated")
         
         return {"response": result_text, "success": True}
     
     except Exception as e:
-        logger.error(f" Tracing generateQuestion error: {str(e)}", exc_info=True)
+        logger.error(" Tracing generateQuestion error: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Question generation failed: {str(e)}"
@@ -501,7 +503,7 @@ async def tracing_generate_feedback(
     Grade variable trace answer and provide feedback.
     Ported from codex-tracing-router.ts:/generateFeedback
     """
-    logger.info(f" Tracing generateFeedback - User: {current_user.username}")
+    logger.info(" Tracing generateFeedback - User: %s", current_user.username)
     
     system_prompt = """You are an AI assistant that helps users understand programming concepts. 
 Given the current frame state, the code block to be executed, the user's answer about what a variable will be, 
@@ -522,18 +524,18 @@ Previous Responses: {previous_responses or 'None'}"""
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_message}
             ],
-            model="phi-3-mini",
+            model=settings.FEEDBACK_MODEL,
             temperature=0.25,
-            max_tokens=256
+            max_tokens=64
         )
         
         feedback_text = response.get("choices", [{}])[0].get("message", {}).get("content", "")
-        logger.info(f" Tracing feedback generated")
+        logger.info(" Tracing feedback generated")
         
         return {"feedback": feedback_text, "success": True}
     
     except Exception as e:
-        logger.error(f" Tracing generateFeedback error: {str(e)}", exc_info=True)
+        logger.error(" Tracing generateFeedback error: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Feedback generation failed: {str(e)}"
@@ -553,9 +555,9 @@ async def pseudo_generate(
     Generate pseudocode for a given problem description.
     Ported from codex-pseudo-router.ts:/generate
     """
-    logger.info(f" Pseudo generate - User: {current_user.username}")
+    logger.info(" Pseudo generate - User: %s", current_user.username)
     
-    system_prompt = "Generate clear, structured pseudocode for the following problem description. Use logical control structures and meaningful variable names."
+    system_prompt = "Generate clear, structured pseudocode for the following problem description. Use logical control structures and meaningful variable names. Write END PSEUDOCODE on its own line when the pseudocode is complete."
     
     try:
         response = await ollama_service.chat_completion(
@@ -565,16 +567,17 @@ async def pseudo_generate(
             ],
             model="phi-3-mini",
             temperature=0.2,
-            max_tokens=800
+            max_tokens=800,
+            stop=["END PSEUDOCODE"]
         )
         
         pseudo_text = response.get("choices", [{}])[0].get("message", {}).get("content", "")
-        logger.info(f" Pseudocode generated")
+        logger.info(" Pseudocode generated")
         
         return {"pseudocode": pseudo_text, "success": True}
     
     except Exception as e:
-        logger.error(f" Pseudo generate error: {str(e)}", exc_info=True)
+        logger.error(" Pseudo generate error: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Pseudocode generation failed: {str(e)}"
@@ -591,11 +594,12 @@ async def verify_generate_issue(
     Identify issues in code compared to task requirements.
     Ported from codex-verify-router.ts:/generateIssue
     """
-    logger.info(f" Verify generateIssue - User: {current_user.username}")
+    logger.info(" Verify generateIssue - User: %s", current_user.username)
     
     system_prompt = """Analyze the provided code and compare it to the task requirements. 
 Identify any logical errors, missing functionality, or edge cases not handled. 
-Return a JSON with: {"issues": [{"issue": "...", "severity": "high|medium|low"}]}"""
+Return a JSON with: {"issues": [{"issue": "...", "severity": "high|medium|low"}]}
+Write [end] immediately after the JSON."""
     
     user_message = f"Task: {task}\n\nCode:\n{code}"
     
@@ -607,11 +611,12 @@ Return a JSON with: {"issues": [{"issue": "...", "severity": "high|medium|low"}]
             ],
             model="phi-3-mini",
             temperature=0.2,
-            max_tokens=500
+            max_tokens=500,
+            stop=["[end]"]
         )
         
         result_text = response.get("choices", [{}])[0].get("message", {}).get("content", "")
-        logger.info(f" Issues identified")
+        logger.info(" Issues identified")
         
         try:
             result = json.loads(result_text)
@@ -621,7 +626,7 @@ Return a JSON with: {"issues": [{"issue": "...", "severity": "high|medium|low"}]
         return {"response": result, "success": True}
     
     except Exception as e:
-        logger.error(f" Verify generateIssue error: {str(e)}", exc_info=True)
+        logger.error(" Verify generateIssue error: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Issue identification failed: {str(e)}"
@@ -632,81 +637,23 @@ Return a JSON with: {"issues": [{"issue": "...", "severity": "high|medium|low"}]
 # PLACEHOLDER STUBS FOR REMAINING TECHNIQUES (Future Implementation)
 # ============================================================================
 
-@router.post("/token/code-to-token")
-async def token_code_to_token(
-    code: str,
-    current_user: User = Depends(get_current_user)
-):
-    """
-    Tokenize code for token-based learning technique.
-    Ported from codex-token-router.ts:/codetotoken
-    """
-    logger.info(f" Token codetotoken - User: {current_user.username}")
-    return {"message": "Not yet implemented", "status": "pending"}
-
-
-@router.post("/selfexplain/feedback")
-async def selfexplain_feedback(
-    code: str,
-    explanation: str,
-    current_user: User = Depends(get_current_user)
-):
-    """
-    Grade self-explanation of code.
-    Ported from codex-selfexplain-router.ts:/feedback
-    """
-    logger.info(f" SelfExplain feedback - User: {current_user.username}")
-    return {"message": "Not yet implemented", "status": "pending"}
-
-
-@router.post("/selfexplain/generate-question")
-async def selfexplain_generate_question(
-    code: str,
-    task: str,
-    current_user: User = Depends(get_current_user)
-):
-    """
-    Generate self-explanation questions.
-    Ported from codex-selfexplain-router.ts:/generateQuestion
-    """
-    logger.info(f" SelfExplain generateQuestion - User: {current_user.username}")
-    return {"message": "Not yet implemented", "status": "pending"}
-
-
-@router.post("/parsons/generate")
-async def parsons_generate(
-    task: str,
-    current_user: User = Depends(get_current_user)
-):
-    """
-    Generate Parsons problem (code rearrangement exercise).
-    Ported from codex-parsons-router.ts:/generate
-    """
-    logger.info(f" Parsons generate - User: {current_user.username}")
-    return {"message": "Not yet implemented", "status": "pending"}
-
-
-@router.post("/hierarchical/code-to-pseudocode")
-async def hierarchical_code_to_pseudocode(
-    code: str,
-    current_user: User = Depends(get_current_user)
-):
-    """
-    Convert code to hierarchical pseudocode.
-    Ported from codex-hierarchical-router.ts:/codetopseudocode
-    """
-    logger.info(f" Hierarchical codetopseudocode - User: {current_user.username}")
+# Routes from codex-token/selfexplain/parsons/hierarchical/writeover-router.ts.
+# They share one handler without get_current_user, so hitting a stub costs
+# no JWT decode or user lookup.
+STUB_ROUTES = [
+    "/token/code-to-token",
+    "/selfexplain/feedback",
+    "/selfexplain/generate-question",
+    "/parsons/generate",
+    "/hierarchical/code-to-pseudocode",
+    "/writeover/generate",
+]
+
+
+async def not_implemented():
+    """Placeholder response for techniques that are not ported yet."""
     return {"message": "Not yet implemented", "status": "pending"}
 
 
-@router.post("/writeover/generate")
-async def writeover_generate(
-    code: str,
-    current_user: User = Depends(get_current_user)
-):
-    """
-    Generate write-over exercise (fill-in-the-blanks code).
-    Ported from codex-writeover-router.ts:/generate
-    """
-    logger.info(f" WriteOver generate - User: {current_user.username}")
-    return {"message": "Not yet implemented", "status": "pending"}
+for _path in STUB_ROUTES:
+    router.add_api_route(_path, not_implemented, methods=["POST"])
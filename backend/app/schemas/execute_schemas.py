@@ -2,21 +2,16 @@
 Schemas for code execution endpoints.
 Handles enqueue requests and polling responses.
 """
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Optional, Dict, Any, Literal
 from datetime import datetime
-from enum import Enum
 
 
-class RunStatus(str, Enum):
-    """Status of a code execution job."""
-    QUEUED = "queued"
-    RUNNING = "running"
-    SUCCESS = "success"
-    ERROR = "error"
-    TIMEOUT = "timeout"
-    COMPILATION_ERROR = "compilation_error"
-    CANCELLED = "cancelled"
+# Mirrors app.models.models.RunStatus values; a Literal validates with a single
+# membership check instead of an Enum lookup on every poll response.
+RunStatusLiteral = Literal[
+    "queued", "running", "success", "error", "timeout", "compilation_error", "cancelled"
+]
 
 
 class FileData(BaseModel):
@@ -25,6 +20,8 @@ class FileData(BaseModel):
     path: str = Field(..., description="File path in project (e.g., 'src/Main.java')")
     content: str = Field(..., description="File content")
     is_main: bool = Field(False, description="Whether this is the main/entry file")
+    
+    model_config = ConfigDict(frozen=True, from_attributes=True)
 
 
 class ExecuteRequest(BaseModel):
@@ -51,8 +48,8 @@ class ExecuteRequest(BaseModel):
         description="Standard input for the program"
     )
     
-    class Config:
-        schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "language": "python",
                 "files": [
@@ -69,6 +66,7 @@ class ExecuteRequest(BaseModel):
                 "stdin": None
             }
         }
+    )
 
 
 class BuildOutput(BaseModel):
@@ -77,20 +75,22 @@ class BuildOutput(BaseModel):
     stderr: str = Field(..., description="Build standard error")
     exit_code: int = Field(..., description="Build exit code")
     execution_time: float = Field(..., description="Build execution time in seconds")
+    
+    model_config = ConfigDict(frozen=True, from_attributes=True)
 
 
 class ExecuteEnqueueResponse(BaseModel):
     """Response when a job is enqueued (202 Accepted)."""
     run_id: int = Field(..., description="Unique ID for this execution job")
-    status: str = Field(default="queued", description="Initial status is always 'queued'")
+    status: RunStatusLiteral = Field(default="queued", description="Initial status is always 'queued'")
     position: Optional[int] = Field(None, description="Position in queue (if available)")
     message: str = Field(
         default="Job queued for execution",
         description="Human-readable status message"
     )
     
-    class Config:
-        schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "run_id": 123,
                 "status": "queued",
@@ -98,13 +98,14 @@ class ExecuteEnqueueResponse(BaseModel):
                 "message": "Job queued for execution"
             }
         }
+    )
 
 
 class ExecuteResultResponse(BaseModel):
     """Response from polling job status/results (200 OK)."""
     run_id: int = Field(..., description="Execution job ID")
     attempt_id: int = Field(..., description="Associated attempt ID")
-    status: str = Field(..., description="Job status")
+    status: RunStatusLiteral = Field(..., description="Job status")
     
     # Build phase
     build_output: Optional[BuildOutput] = Field(
@@ -129,9 +130,10 @@ class ExecuteResultResponse(BaseModel):
         description="Total elapsed time (build + run) in seconds"
     )
     
-    class Config:
-        from_attributes = True
-        schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        from_attributes=True,
+        json_schema_extra={
             "example": {
                 "run_id": 123,
                 "attempt_id": 42,
@@ -152,6 +154,7 @@ class ExecuteResultResponse(BaseModel):
                 "total_time": 5.357
             }
         }
+    )
 
 
 class ExecuteErrorResponse(BaseModel):
@@ -160,11 +163,12 @@ class ExecuteErrorResponse(BaseModel):
     status_code: int = Field(..., description="HTTP status code")
     run_id: Optional[int] = Field(None, description="Run ID if applicable")
     
-    class Config:
-        schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "detail": "Run already in progress for this attempt",
                 "status_code": 409,
                 "run_id": None
             }
         }
+    )
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
@@ -125,7 +125,7 @@ class AttemptResponse(AttemptBase):
 class EventCreate(BaseModel):
     t: float
     seq: int
-    type: str
+    type: str = Field(max_length=50, pattern=r'^[a-z][a-z0-9_]*$')  # snake_case name, see event_types
     file_path: Optional[str] = None  # NEW: For multi-file project support
     payload_json: str
 
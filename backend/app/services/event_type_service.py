@@ -0,0 +1,81 @@
+"""
+Dictionary encoding of event types.
+
+events.type_id references event_types(id, name). The set of names is small
+and only grows, so name -> id lookups are cached for the life of the process
+and only unseen names touch the database.
+"""
+from typing import Dict, Iterable
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import engine
+from app.models.models import EventType
+
+# Session.info key: (transaction, {name: id}) for names that transaction registered
+_UNCOMMITTED = "uncommitted_event_types"
+
+
+class EventTypeService:
+    """Resolves event type names to event_types ids, registering new names."""
+    
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+    
+    async def get_ids(self, db: AsyncSession, names: Iterable[str]) -> Dict[str, int]:
+        """
+        Map every name to its event_types id (the returned dict may hold more names).
+        
+        Unseen names are registered in the caller's transaction, so they commit
+        or roll back together with the events that reference them. Only ids of
+        rows some earlier transaction committed are cached.
+        
+        Raises ValueError if registering the names would exceed MAX_EVENT_TYPES.
+        """
+        missing = set(names) - self._ids.keys()
+        if not missing:
+            return self._ids
+        
+        result = await db.execute(
+            select(EventType.name, EventType.id).where(EventType.name.in_(missing))
+        )
+        found = dict(result.all())
+        
+        # Registrations of an earlier transaction on this session were
+        # committed (now cacheable) or rolled back (gone)
+        transaction = db.sync_session.get_transaction()
+        registered_in, uncommitted = db.info.get(_UNCOMMITTED, (None, {}))
+        if registered_in is not transaction:
+            uncommitted = {}
+        self._ids.update((name, id_) for name, id_ in found.items() if name not in uncommitted)
+        
+        new = missing - found.keys()
+        if new:
+            registered = await db.scalar(select(func.count()).select_from(EventType))
+            if registered + len(new) > settings.MAX_EVENT_TYPES:
+                raise ValueError(
+                    f"Too many event types (limit {settings.MAX_EVENT_TYPES}): {', '.join(sorted(new))}"
+                )
+            
+            # A concurrent request may register the same name: ignore conflicts
+            # (Postgres waits for that transaction, then the SELECT sees its row)
+            insert = postgresql.insert if engine.dialect.name == "postgresql" else sqlite.insert
+            await db.execute(
+                insert(EventType)
+                .values([{"name": name} for name in new])
+                .on_conflict_do_nothing(index_elements=["name"])
+            )
+            result = await db.execute(
+                select(EventType.name, EventType.id).where(EventType.name.in_(new))
+            )
+            uncommitted.update(result.all())
+            db.info[_UNCOMMITTED] = (transaction, uncommitted)
+        
+        return {**self._ids, **found, **uncommitted}
+
+
+# Global instance
+event_type_service = EventTypeService()
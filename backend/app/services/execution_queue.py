@@ -9,29 +9,55 @@ Set QUEUE_BACKEND in .env to switch:
   QUEUE_BACKEND=redis        # Phase 2
 """
 import asyncio
-import json
-import hashlib
 import logging
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
+import orjson
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import update
 from app.config import settings
 from app.models.models import Run, RunStatus, Attempt
 from app.services.executor_service import ExecutorService
+from app.services.snapshot_service import store_snapshot
+from app.services.result_cache import run_cache_key, run_result_cache
 
 logger = logging.getLogger(__name__)
 
+# Executor statuses that map directly; anything else is decided by exit code
+_STATUS_MAP: Dict[str, RunStatus] = {
+    'timeout': RunStatus.TIMEOUT,
+    'compilation_error': RunStatus.COMPILATION_ERROR,
+}
+
 
 class ExecutionJob:
     """Internal representation of a job in the queue."""
-    def __init__(self, run_id: int, payload: Dict):
+    def __init__(self, run_id: int, payload: Dict, snapshot_hash: Optional[str] = None):
         self.run_id = run_id
         self.payload = payload
+        self.snapshot_hash = snapshot_hash  # computed at enqueue; lets the store skip duplicates
         self.attempt_id = payload['attempt_id']
         self.created_at = datetime.utcnow()
 
 
+def _serialize_for_persist(payload: Dict, known_hash: Optional[str] = None) -> Tuple[str, str, int]:
+    """
+    Store the job's snapshot and build its request_json (blocking; run in a thread).
+    
+    Returns:
+        (snapshot_hash, request_json, snapshot size)
+    """
+    snapshot_hash, snapshot_size = store_snapshot(
+        payload['files'], settings.SNAPSHOT_DIR, known_hash
+    )
+    
+    # Files live in the snapshot store under snapshot_hash; keep only the rest
+    req_meta = {k: v for k, v in payload.items() if k != 'files'}
+    req_meta['files_hash'] = snapshot_hash
+    
+    return snapshot_hash, orjson.dumps(req_meta).decode('utf-8'), snapshot_size
+
+
 class ExecutionQueueManager:
     """
     Manages in-process execution queue with worker pool.
@@ -39,13 +65,23 @@ class ExecutionQueueManager:
     """
     
     def __init__(self):
-        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.QUEUE_MAX_SIZE)
-        self.semaphore: asyncio.Semaphore = asyncio.Semaphore(settings.MAX_CONCURRENT_EXECUTIONS)
+        # One queue shard per worker (keyed by run_id) so workers don't all wake on every put
+        num_shards = max(1, settings.EXECUTION_WORKERS)
+        shard_size = -(-settings.QUEUE_MAX_SIZE // num_shards)
+        self.queues: List[asyncio.Queue] = [
+            asyncio.Queue(maxsize=shard_size) for _ in range(num_shards)
+        ]
+        # Admission control: active count under a Condition so the limit can be resized at runtime
+        self._cond: asyncio.Condition = asyncio.Condition()
+        self._active = 0
+        self._cmax = settings.MAX_CONCURRENT_EXECUTIONS
         self.workers_running = False
         self.worker_tasks = []
         self.last_enqueue_time: Dict[int, float] = {}  # attempt_id -> timestamp
     
-    async def enqueue_job(self, run_id: int, payload: Dict) -> Tuple[bool, str]:
+    async def enqueue_job(
+        self, run_id: int, payload: Dict, snapshot_hash: Optional[str] = None
+    ) -> Tuple[bool, str]:
         """
         Enqueue a job for execution.
         
@@ -53,13 +89,14 @@ class ExecutionQueueManager:
             (success: bool, message: str)
         """
         try:
-            job = ExecutionJob(run_id, payload)
+            job = ExecutionJob(run_id, payload, snapshot_hash)
+            queue = self.queues[run_id % len(self.queues)]
             await asyncio.wait_for(
-                self.queue.put(job),
+                queue.put(job),
                 timeout=1.0
             )
             logger.info(f"Enqueued run {run_id} (attempt {job.attempt_id})")
-            return True, f"Job enqueued (position: {self.queue.qsize()})"
+            return True, f"Job enqueued (position: {queue.qsize()})"
         except asyncio.TimeoutError:
             logger.error(f"Queue full, rejecting run {run_id}")
             return False, "Execution queue overloaded"
@@ -67,12 +104,31 @@ class ExecutionQueueManager:
             logger.error(f"Failed to enqueue run {run_id}: {e}")
             return False, f"Enqueueing failed: {str(e)}"
     
+    async def _acquire(self) -> None:
+        """Wait for an execution slot."""
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._active < self._cmax)
+            self._active += 1
+    
+    async def _release(self) -> None:
+        """Free an execution slot and wake one waiter."""
+        async with self._cond:
+            self._active -= 1
+            self._cond.notify(1)
+    
+    async def set_cmax(self, new_cmax: int) -> None:
+        """Change the concurrent execution limit; waiters re-check against it."""
+        async with self._cond:
+            self._cmax = max(1, new_cmax)
+            self._cond.notify_all()
+    
     def get_queue_position(self) -> int:
-        """Get current queue size."""
-        return self.queue.qsize()
+        """Get current queue size (all shards)."""
+        return sum(queue.qsize() for queue in self.queues)
     
-    async def start_workers(self, num_workers: int = 2) -> None:
-        """Start worker tasks."""
+    async def start_workers(self, num_workers: Optional[int] = None) -> None:
+        """Start worker tasks. Worker i consumes shard i % number of shards."""
+        num_workers = num_workers or settings.EXECUTION_WORKERS
         if self.workers_running:
             logger.warning("Workers already running")
             return
@@ -98,42 +154,79 @@ class ExecutionQueueManager:
         """Worker coroutine that processes jobs from the queue."""
         logger.info(f"Worker {worker_id} started")
         
-        while self.workers_running:
-            try:
-                # Get next job (with timeout to check shutdown flag)
-                job = await asyncio.wait_for(
-                    self.queue.get(),
-                    timeout=1.0
-                )
-                
-                async with self.semaphore:
-                    await self._execute_job(job, worker_id)
+        own_index = worker_id % len(self.queues)
+        
+        # Import here to avoid circular dependency
+        from app.database import async_session_maker
+        
+        # One session for the worker's lifetime; it only holds a connection inside a transaction
+        async with async_session_maker() as session:
+            while self.workers_running:
+                try:
+                    queue = self.queues[own_index]
+                    try:
+                        # Get next job (with timeout to check shutdown flag)
+                        job = await asyncio.wait_for(
+                            queue.get(),
+                            timeout=1.0
+                        )
+                    except asyncio.TimeoutError:
+                        # Own shard idle for 1s: try to steal from a neighbour
+                        queue, job = self._steal_job(own_index)
+                        if job is None:
+                            continue
+                    
+                    await self._acquire()
+                    try:
+                        await self._execute_job(session, job, worker_id)
+                    finally:
+                        await self._release()
+                    
+                    queue.task_done()
                 
-                self.queue.task_done()
-            
-            except asyncio.TimeoutError:
-                # No job available; check shutdown flag and continue
-                continue
-            except Exception as e:
-                logger.error(f"Worker {worker_id} error: {e}")
+                except Exception as e:
+                    logger.error(f"Worker {worker_id} error: {e}")
+                    # Leave the shared session usable for the next job
+                    await session.rollback()
         
         logger.info(f"Worker {worker_id} stopped")
     
-    async def _execute_job(self, job: ExecutionJob, worker_id: int) -> None:
-        """Execute a single job and persist results."""
+    def _steal_job(self, own_index: int) -> Tuple[Optional[asyncio.Queue], Optional[ExecutionJob]]:
+        """Take a waiting job from another shard, starting with the next one."""
+        for offset in range(1, len(self.queues)):
+            queue = self.queues[(own_index + offset) % len(self.queues)]
+            try:
+                return queue, queue.get_nowait()
+            except asyncio.QueueEmpty:
+                continue
+        return None, None
+    
+    async def _execute_job(self, session: AsyncSession, job: ExecutionJob, worker_id: int) -> None:
+        """Execute a single job and persist results using the worker's session."""
         run_id = job.run_id
         attempt_id = job.attempt_id
         
         logger.info(f"Worker {worker_id} executing run {run_id}")
         
-        # Import here to avoid circular dependency
-        from app.database import async_session_maker
-        
-        async with async_session_maker() as session:
-            try:
-                # Mark as running
+        try:
+            # Encode, hash and write in a thread so large snapshots don't stall other workers
+            snapshot_hash, request_json, snapshot_size = await asyncio.to_thread(
+                _serialize_for_persist, job.payload, job.snapshot_hash
+            )
+            
+            # Unchanged re-run: reuse the previous result instead of executing again
+            cache_key = run_cache_key(job.payload, snapshot_hash)
+            started_at = datetime.utcnow()
+            result = run_result_cache.get(cache_key)
+            
+            if result is not None:
+                # Nothing ran: the run never enters RUNNING and takes no time
+                logger.info(f"Run {run_id} served from result cache")
+                finished_at = started_at
+            else:
+                # Mark as running in its own short transaction so pollers see it early
                 await self._update_run_status(
-                    session, run_id, RunStatus.RUNNING, started_at=datetime.utcnow()
+                    session, run_id, RunStatus.RUNNING, started_at=started_at
                 )
                 
                 # Execute the code
@@ -144,77 +237,62 @@ class ExecutionQueueManager:
                     build_command=job.payload.get('build_command'),
                     run_command=job.payload.get('run_command'),
                 )
-                
-                # Determine final status
-                status = result['status']
-                if status == 'timeout':
-                    final_status = RunStatus.TIMEOUT
-                elif status == 'compilation_error':
-                    final_status = RunStatus.COMPILATION_ERROR
-                elif status == 'error' and result.get('exit_code') != 0:
-                    final_status = RunStatus.ERROR
-                else:
-                    final_status = RunStatus.SUCCESS
-                
-                # Persist snapshot if under size threshold
-                snapshot_json = json.dumps([
-                    {'name': f['name'], 'path': f['path'], 'content': f['content']}
-                    for f in job.payload['files']
-                ])
-                snapshot_size = len(snapshot_json.encode('utf-8'))
-                code_snapshot = snapshot_json if snapshot_size <= settings.SNAPSHOT_SIZE_THRESHOLD else None
-                
-                # Compute hash
-                snapshot_hash = hashlib.sha256(snapshot_json.encode()).hexdigest()
-                
-                # Build total time
-                build_time = result.get('build_result', {}).get('execution_time')
-                run_time = result.get('execution_time')
-                total_time = (build_time or 0) + (run_time or 0)
-                
-                # Update run with results
-                stmt = select(Run).where(Run.id == run_id)
-                db_run = (await session.execute(stmt)).scalar_one()
-                
-                db_run.status = final_status
-                db_run.finished_at = datetime.utcnow()
-                db_run.code_snapshot = code_snapshot
-                db_run.snapshot_hash = snapshot_hash
-                db_run.request_json = json.dumps(job.payload)
-                
-                # Build output
-                if result.get('build_result'):
-                    db_run.build_stdout = result['build_result'].get('stdout')
-                    db_run.build_stderr = result['build_result'].get('stderr')
-                    db_run.build_exit_code = result['build_result'].get('exit_code')
-                    db_run.build_time = build_time
-                
+                run_result_cache.put(cache_key, result)
+                finished_at = datetime.utcnow()
+            
+            # Determine final status
+            final_status = _STATUS_MAP.get(result['status']) or (
+                RunStatus.ERROR if result.get('exit_code') != 0 else RunStatus.SUCCESS
+            )
+            
+            # Build total time
+            build_time = (result.get('build_result') or {}).get('execution_time')
+            run_time = result.get('execution_time')
+            total_time = (build_time or 0) + (run_time or 0)
+            
+            # Update run with results in a single UPDATE
+            values = {
+                'status': final_status,
+                'started_at': started_at,
+                'finished_at': finished_at,
+                'snapshot_hash': snapshot_hash,
+                'request_json': request_json,
                 # Run output
-                db_run.stdout = result.get('stdout')
-                db_run.stderr = result.get('stderr')
-                db_run.exit_code = result.get('exit_code')
-                db_run.run_time = run_time
-                
-                await session.commit()
-                
-                logger.info(
-                    f"Run {run_id} completed with status {final_status.value} "
-                    f"(total_time={total_time:.2f}s)"
-                )
+                'stdout': result.get('stdout'),
+                'stderr': result.get('stderr'),
+                'exit_code': result.get('exit_code'),
+                'run_time': run_time,
+            }
             
-            except Exception as e:
-                logger.error(f"Error executing run {run_id}: {e}", exc_info=True)
-                
-                # Mark as error
-                stmt = select(Run).where(Run.id == run_id)
-                db_run = (await session.execute(stmt)).scalar_one_or_none()
-                
-                if db_run:
-                    db_run.status = RunStatus.ERROR
-                    db_run.stderr = f"Internal execution error: {str(e)}"
-                    db_run.finished_at = datetime.utcnow()
-                    await session.commit()
-    
+            # Build output
+            if result.get('build_result'):
+                values['build_stdout'] = result['build_result'].get('stdout')
+                values['build_stderr'] = result['build_result'].get('stderr')
+                values['build_exit_code'] = result['build_result'].get('exit_code')
+                values['build_time'] = build_time
+            
+            await session.execute(update(Run).where(Run.id == run_id).values(**values))
+            await session.commit()
+            
+            logger.info(
+                f"Run {run_id} completed with status {final_status.value} "
+                f"(total_time={total_time:.2f}s)"
+            )
+        
+        except Exception as e:
+            logger.error(f"Error executing run {run_id}: {e}", exc_info=True)
+            
+            # Mark as error (no-op if the run row is gone); discard any failed transaction first
+            await session.rollback()
+            await session.execute(
+                update(Run).where(Run.id == run_id).values(
+                    status=RunStatus.ERROR,
+                    stderr=f"Internal execution error: {str(e)}",
+                    finished_at=datetime.utcnow(),
+                )
+            )
+            await session.commit()
+
     @staticmethod
     async def _update_run_status(
         session: AsyncSession,
@@ -223,13 +301,11 @@ class ExecutionQueueManager:
         started_at: Optional[datetime] = None,
     ) -> None:
         """Update run status in database."""
-        stmt = select(Run).where(Run.id == run_id)
-        run = (await session.execute(stmt)).scalar_one()
-        
-        run.status = status
+        values = {'status': status}
         if started_at:
-            run.started_at = started_at
+            values['started_at'] = started_at
         
+        await session.execute(update(Run).where(Run.id == run_id).values(**values))
         await session.commit()
 
 
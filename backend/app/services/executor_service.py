@@ -6,12 +6,203 @@ Handles custom build/run commands and dependency installation.
 Refactored for queue-based execution: ExecutorService.run_project() is the main
 entry point for worker jobs, returning a structured result dict.
 """
-import subprocess
+import asyncio
+import functools
+import logging
 import tempfile
 import os
+import shutil
 import time
 import shlex
-from typing import Dict, Any, List, Optional
+import uuid
+from typing import Callable, Dict, Any, List, Optional, Tuple
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# O_BINARY keeps Windows from translating newlines on raw writes
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+# openat()-style opens relative to the work dir fd, where the platform has them
+_DIR_FD_OPEN = os.open in os.supports_dir_fd and hasattr(os, 'O_DIRECTORY')
+
+# Default build/run commands per language (shared; callers must not mutate)
+_DEFAULT_COMMANDS: Dict[str, Dict[str, Optional[str]]] = {
+    'python': {
+        'build': 'pip install -r requirements.txt',  # if requirements.txt exists
+        'run': 'python main.py'
+    },
+    'java': {
+        'build': 'javac *.java',
+        'run': 'java Main'
+    },
+    'c': {
+        'build': 'gcc *.c -o app',
+        'run': './app'
+    },
+    'cpp': {
+        'build': 'g++ *.cpp -o app',
+        'run': './app'
+    },
+}
+_NO_COMMANDS: Dict[str, Optional[str]] = {'build': None, 'run': None}
+
+# Idle work directories per language, reused across runs instead of mkdtemp/rmtree
+_work_dir_pool: Dict[str, List[str]] = {}
+
+# Images for the warm container pool (enabled when WARM_CONTAINERS_PER_LANG > 0)
+_CONTAINER_IMAGES: Dict[str, str] = {
+    'python': 'python:3.11-slim',
+    'java': 'eclipse-temurin:17-jdk',
+    'c': 'gcc:13',
+    'cpp': 'gcc:13',
+}
+# Idle warm container IDs per language
+_container_pool: Dict[str, asyncio.Queue] = {}
+# Host dir of each warm container, mounted as its /work (the only host path it sees)
+_container_dirs: Dict[str, str] = {}
+
+
+def _work_parent() -> Optional[str]:
+    """Parent dir for run work dirs (WORK_TMPFS, or the system temp dir if unset)."""
+    return settings.WORK_TMPFS or None
+
+
+@functools.lru_cache(maxsize=1024)
+def _split_command(command: str) -> Tuple[str, ...]:
+    """shlex.split, memoized: the same few build/run commands repeat across runs."""
+    return tuple(shlex.split(command))
+
+
+async def _read_capped(
+    stream: asyncio.StreamReader, limit: int, on_limit: Callable[[], None]
+) -> Tuple[bytes, bool]:
+    """Read a stream to EOF in 64KB chunks, keeping at most `limit` bytes; call on_limit once past it."""
+    buf = bytearray()
+    truncated = False
+    while True:
+        chunk = await stream.read(65536)
+        if not chunk:
+            break
+        room = limit - len(buf)
+        if room > 0:
+            buf += chunk[:room]
+        if len(chunk) > room and not truncated:
+            truncated = True
+            on_limit()  # stop the producer; keep draining to EOF so nothing blocks
+    return bytes(buf), truncated
+
+
+async def _feed_stdin(stream: asyncio.StreamWriter, data: bytes) -> None:
+    """Write stdin and close it; a child that exits early just drops the rest."""
+    try:
+        if data:
+            stream.write(data)
+            await stream.drain()
+    except (BrokenPipeError, ConnectionResetError):
+        pass
+    finally:
+        stream.close()
+
+
+async def _collect_output(
+    proc: asyncio.subprocess.Process, input_bytes: bytes, limit: int
+) -> Tuple[Tuple[bytes, bool], Tuple[bytes, bool]]:
+    """Feed stdin, read capped stdout/stderr (killing the child past the cap) and wait for exit."""
+    def kill() -> None:
+        if proc.returncode is None:
+            proc.kill()
+    
+    out, err, _ = await asyncio.gather(
+        _read_capped(proc.stdout, limit, kill),
+        _read_capped(proc.stderr, limit, kill),
+        _feed_stdin(proc.stdin, input_bytes),
+    )
+    await proc.wait()
+    return out, err
+
+
+def _decode_output(data: bytes, truncated: bool) -> str:
+    """Decode captured output, marking it if the byte cap was hit."""
+    text = data.decode('utf-8', errors='replace')
+    if truncated:
+        text += f"\n[output truncated at {len(data)} bytes]"
+    return text
+
+
+def _parse_memory(limit: str) -> int:
+    """Docker-style memory string ('256m', '1g', '512k' or bytes) to bytes."""
+    units = {'k': 1024, 'm': 1024 ** 2, 'g': 1024 ** 3}
+    limit = limit.strip().lower()
+    if limit and limit[-1] in units:
+        return int(float(limit[:-1]) * units[limit[-1]])
+    return int(limit)
+
+
+def _create_cgroup() -> str:
+    """Create a cgroup v2 leaf under CGROUP_ROOT with the executor's memory/CPU limits."""
+    path = os.path.join(settings.CGROUP_ROOT, f'run-{uuid.uuid4().hex}')
+    os.mkdir(path)
+    limits = {
+        'memory.max': str(_parse_memory(ExecutorService.MAX_MEMORY)),
+        'memory.swap.max': '0',
+        'cpu.max': f'{int(float(ExecutorService.MAX_CPU) * 100000)} 100000',
+    }
+    for name, value in limits.items():
+        try:
+            with open(os.path.join(path, name), 'w') as f:
+                f.write(value)
+        except FileNotFoundError:
+            pass  # controller not enabled for this subtree (e.g. no swap accounting)
+    return path
+
+
+def _enter_cgroup(path: str) -> None:
+    """preexec_fn: move the forked child into its cgroup before exec."""
+    fd = os.open(os.path.join(path, 'cgroup.procs'), os.O_WRONLY)
+    try:
+        os.write(fd, str(os.getpid()).encode())
+    finally:
+        os.close(fd)
+
+
+def _oom_killed(path: str) -> bool:
+    """Whether the kernel OOM-killed anything in the cgroup (memory.events oom_kill)."""
+    try:
+        with open(os.path.join(path, 'memory.events')) as f:
+            for line in f:
+                key, _, value = line.partition(' ')
+                if key == 'oom_kill':
+                    return int(value) > 0
+    except OSError:
+        pass
+    return False
+
+
+def _remove_cgroup(path: str) -> None:
+    """Kill anything left in the cgroup (e.g. forked grandchildren) and remove it."""
+    try:
+        with open(os.path.join(path, 'cgroup.kill'), 'w') as f:
+            f.write('1')
+    except OSError:
+        pass
+    for _ in range(50):
+        try:
+            os.rmdir(path)
+            return
+        except FileNotFoundError:
+            return
+        except OSError:
+            time.sleep(0.01)  # killed tasks take a moment to leave the cgroup
+
+
+def _clear_dir(path: str) -> None:
+    """Empty a directory in place (scandir + unlink; rmtree only for subdirectories)."""
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path)
+            else:
+                os.unlink(entry.path)
 
 
 class ExecutorService:
@@ -26,84 +217,257 @@ class ExecutorService:
     @staticmethod
     def get_default_commands(language: str) -> Dict[str, Optional[str]]:
         """Get default build and run commands for a language."""
-        language = language.lower()
-        
-        defaults = {
-            'python': {
-                'build': 'pip install -r requirements.txt',  # if requirements.txt exists
-                'run': 'python main.py'
-            },
-            'java': {
-                'build': 'javac *.java',
-                'run': 'java Main'
-            },
-            'c': {
-                'build': 'gcc *.c -o app',
-                'run': './app'
-            },
-            'cpp': {
-                'build': 'g++ *.cpp -o app',
-                'run': './app'
-            },
-        }
-        
-        return defaults.get(language, {'build': None, 'run': None})
+        return _DEFAULT_COMMANDS.get(language.lower(), _NO_COMMANDS)
     
     @staticmethod
     async def write_project_files(work_dir: str, files: List[Dict[str, str]]) -> str:
         """Write all project files to working directory. Returns main file path."""
+        # Disk I/O runs in a thread so the event loop keeps serving other jobs
+        return await asyncio.to_thread(ExecutorService._write_project_files_sync, work_dir, files)
+    
+    @staticmethod
+    def _write_project_files_sync(work_dir: str, files: List[Dict[str, str]]) -> str:
+        """Blocking part of write_project_files: raw os.open/os.write per file."""
+        # Resolve paths, parent dirs and the main file up front, outside the write loop
+        paths = [os.path.join(work_dir, file['name']) for file in files]
         main_file = None
-        
-        for file in files:
-            file_path = os.path.join(work_dir, file['name'])
-            
-            # Create subdirectories if needed
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
-            
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(file['content'])
-            
-            # Track main file
+        for file, file_path in zip(files, paths):
             if 'main' in file['name'].lower() or file.get('is_main'):
                 main_file = file_path
         
+        # One makedirs per unique parent (sorted so parents come before children)
+        for parent_dir in sorted({os.path.dirname(path) for path in paths}):
+            os.makedirs(parent_dir, exist_ok=True)
+        
+        # Open files relative to a work_dir fd so the kernel doesn't re-walk the
+        # absolute prefix for every file (POSIX; plain paths elsewhere)
+        dir_fd = None
+        if _DIR_FD_OPEN:
+            dir_fd = os.open(work_dir, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            for file, file_path in zip(files, paths):
+                # Bytes through a raw fd skip the TextIOWrapper encode path
+                view = memoryview(file['content'].encode('utf-8'))  # partial writes advance without copying
+                if dir_fd is not None:
+                    fd = os.open(file['name'], _WRITE_FLAGS, 0o644, dir_fd=dir_fd)
+                else:
+                    fd = os.open(file_path, _WRITE_FLAGS, 0o644)
+                try:
+                    while view:
+                        view = view[os.write(fd, view):]
+                finally:
+                    os.close(fd)
+        finally:
+            if dir_fd is not None:
+                os.close(dir_fd)
+        
         return main_file or files[0]['name'] if files else None
     
+    @staticmethod
+    def _acquire_work_dir(language: str) -> str:
+        """Take an empty work dir from the pool, or create one (on WORK_TMPFS if set)."""
+        pool = _work_dir_pool.get(language)
+        if pool:
+            return pool.pop()
+        return tempfile.mkdtemp(prefix=f'cognicode-{language}-', dir=_work_parent())
+    
+    @staticmethod
+    def prefill_work_dirs() -> None:
+        """Create WORK_DIR_POOL_SIZE idle work dirs per language ahead of the first runs."""
+        for language in _DEFAULT_COMMANDS:
+            pool = _work_dir_pool.setdefault(language, [])
+            while len(pool) < settings.WORK_DIR_POOL_SIZE:
+                pool.append(tempfile.mkdtemp(prefix=f'cognicode-{language}-', dir=_work_parent()))
+    
+    @staticmethod
+    async def _release_work_dir(language: str, work_dir: str) -> None:
+        """Clear a work dir and return it to the pool; remove it if the pool is full."""
+        pool = _work_dir_pool.setdefault(language, [])
+        if len(pool) < settings.WORK_DIR_POOL_SIZE:
+            try:
+                await asyncio.to_thread(_clear_dir, work_dir)
+            except OSError:
+                pass
+            else:
+                # Re-check: other jobs may have refilled the pool while we were clearing
+                if len(pool) < settings.WORK_DIR_POOL_SIZE:
+                    pool.append(work_dir)
+                    return
+        await ExecutorService._remove_tree(work_dir)
+    
+    @staticmethod
+    async def _remove_tree(path: str) -> None:
+        """Delete a directory tree without blocking the event loop."""
+        if os.name == 'posix':
+            # rm -rf walks with getdents/unlinkat in C: much faster than rmtree on big trees
+            proc = await asyncio.create_subprocess_exec(
+                'rm', '-rf', '--', path,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL
+            )
+            if await proc.wait() == 0:
+                return
+        await asyncio.to_thread(shutil.rmtree, path, True)
+    
+    @staticmethod
+    async def _docker(*args: str) -> str:
+        """Run a docker CLI command and return its stdout."""
+        proc = await asyncio.create_subprocess_exec(
+            'docker', *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await proc.communicate()
+        if proc.returncode != 0:
+            raise RuntimeError(f"docker {args[0]} failed: {stderr.decode('utf-8', errors='replace').strip()}")
+        return stdout.decode('utf-8').strip()
+    
+    @staticmethod
+    async def _start_container(language: str) -> str:
+        """Start one idle, network-less container for a language; returns its ID."""
+        # Each container gets a directory of its own: runs in other containers
+        # (other users) are not visible from inside
+        work_dir = tempfile.mkdtemp(prefix=f'cognicode-{language}-', dir=_work_parent())
+        try:
+            container_id = await ExecutorService._docker(
+                'run', '-d',
+                '--memory', ExecutorService.MAX_MEMORY,
+                '--cpus', ExecutorService.MAX_CPU,
+                '--network', 'none',
+                '-v', f'{work_dir}:/work',
+                _CONTAINER_IMAGES[language],
+                'sleep', 'infinity'
+            )
+        except RuntimeError:
+            await ExecutorService._remove_tree(work_dir)
+            raise
+        _container_dirs[container_id] = work_dir
+        return container_id
+    
+    @staticmethod
+    async def _remove_container(container: str) -> None:
+        """Remove a warm container and its work directory."""
+        try:
+            await ExecutorService._docker('rm', '-f', container)
+        finally:
+            await ExecutorService._remove_tree(_container_dirs.pop(container))
+    
+    @staticmethod
+    async def _release_container(language: str, container: str) -> None:
+        """Reset a borrowed container for the next run and return it to the pool."""
+        try:
+            # As root in the container's PID namespace, kill -1 signals every
+            # process except PID 1 (sleep) and the shell itself: nothing the run
+            # started in the background survives into the next one
+            await ExecutorService._docker('exec', container, 'sh', '-c', 'kill -9 -1 2>/dev/null; true')
+            await asyncio.to_thread(_clear_dir, _container_dirs[container])
+        except (RuntimeError, OSError) as e:
+            logger.warning("Replacing warm container %s: %s", container[:12], e)
+            try:
+                await ExecutorService._remove_container(container)
+                container = await ExecutorService._start_container(language)
+            except RuntimeError as e:
+                logger.error("Could not replace warm container for %s: %s", language, e)
+                return
+        _container_pool[language].put_nowait(container)
+    
+    @staticmethod
+    async def start_container_pool() -> None:
+        """Start WARM_CONTAINERS_PER_LANG long-running containers per language."""
+        for language in _CONTAINER_IMAGES:
+            pool = _container_pool.setdefault(language, asyncio.Queue())
+            container_ids = await asyncio.gather(*(
+                ExecutorService._start_container(language)
+                for _ in range(settings.WARM_CONTAINERS_PER_LANG)
+            ))
+            for container_id in container_ids:
+                pool.put_nowait(container_id)
+    
+    @staticmethod
+    async def stop_container_pool() -> None:
+        """Remove all idle pooled containers."""
+        for pool in _container_pool.values():
+            while not pool.empty():
+                await ExecutorService._remove_container(pool.get_nowait())
+        _container_pool.clear()
+    
     @staticmethod
     async def execute_command(
         command: str,
         work_dir: str,
         timeout: int = 30,
-        input_data: str = ""
+        input_data: str = "",
+        container: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Execute a shell command in the working directory."""
+        """Execute a shell command in the working directory (inside `container` if given)."""
         start_time = time.time()
+        proc = None
+        cgroup = None
         
         try:
             # Parse command safely
-            cmd_args = shlex.split(command) if isinstance(command, str) else command
+            cmd_args = _split_command(command) if isinstance(command, str) else command
+            
+            # Host runs: kernel-enforced MAX_MEMORY/MAX_CPU via a per-command cgroup
+            if settings.CGROUP_ROOT and not container:
+                cgroup = await asyncio.to_thread(_create_cgroup)
+            
+            if container:
+                # work_dir is the container's own directory, mounted at /work
+                cmd_args = (
+                    'docker', 'exec', '-i',
+                    '--workdir', '/work',
+                    container, *cmd_args
+                )
             
-            result = subprocess.run(
-                cmd_args,
+            # Async subprocess: the event loop (and the other workers) keep
+            # running while the child executes
+            proc = await asyncio.create_subprocess_exec(
+                *cmd_args,
                 cwd=work_dir,
-                input=input_data,
-                capture_output=True,
-                text=True,
-                timeout=timeout,
-                shell=False
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                preexec_fn=functools.partial(_enter_cgroup, cgroup) if cgroup else None
+            )
+            # Read both streams concurrently with a byte cap (a print loop can't OOM the server)
+            (stdout, out_truncated), (stderr, err_truncated) = await asyncio.wait_for(
+                _collect_output(proc, (input_data or '').encode('utf-8'), settings.MAX_OUTPUT_BYTES),
+                timeout=timeout
             )
             
             execution_time = time.time() - start_time
             
+            stderr_text = _decode_output(stderr, err_truncated)
+            status = 'success' if proc.returncode == 0 else 'error'
+            
+            if out_truncated or err_truncated:
+                stderr_text += f"\nOutput limit exceeded ({settings.MAX_OUTPUT_BYTES} bytes); program terminated"
+                status = 'output_limit'
+                if container:
+                    # Killing the exec client leaves the program running; restart the container
+                    await ExecutorService._docker('restart', '-t', '0', container)
+            
+            # The OOM killer ends the process right away, so this needs no polling
+            if cgroup and proc.returncode != 0 and _oom_killed(cgroup):
+                stderr_text += f"\nMemory limit exceeded ({ExecutorService.MAX_MEMORY})"
+                status = 'memory_limit'
+            
             return {
-                'stdout': result.stdout,
-                'stderr': result.stderr,
-                'exit_code': result.returncode,
+                'stdout': _decode_output(stdout, out_truncated),
+                'stderr': stderr_text,
+                'exit_code': proc.returncode,
                 'execution_time': execution_time,
-                'status': 'success' if result.returncode == 0 else 'error'
+                'status': status
             }
             
-        except subprocess.TimeoutExpired:
+        except asyncio.TimeoutError:
+            if proc is not None and proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+            if container:
+                # Killing the exec client leaves the program running; restart the container
+                await ExecutorService._docker('restart', '-t', '0', container)
             return {
                 'stdout': '',
                 'stderr': f'Command timed out after {timeout} seconds',
@@ -119,6 +483,9 @@ class ExecutorService:
                 'execution_time': time.time() - start_time,
                 'status': 'error'
             }
+        finally:
+            if cgroup:
+                await asyncio.to_thread(_remove_cgroup, cgroup)
     
     @staticmethod
     async def run_project(
@@ -156,8 +523,13 @@ class ExecutorService:
             }
         """
         
-        # Create temporary working directory
-        work_dir = tempfile.mkdtemp()
+        language = language.lower()
+        
+        # Borrow a warm container if the pool is enabled for this language; its
+        # own (empty) directory is the work dir. Otherwise take a pooled work dir
+        container_pool = _container_pool.get(language)
+        container = await container_pool.get() if container_pool else None
+        work_dir = _container_dirs[container] if container else ExecutorService._acquire_work_dir(language)
         
         try:
             # Write all project files
@@ -180,7 +552,8 @@ class ExecutorService:
                     build_result = await ExecutorService.execute_command(
                         build_cmd,
                         work_dir,
-                        timeout=120  # MAX_BUILD_TIME
+                        timeout=120,  # MAX_BUILD_TIME
+                        container=container
                     )
                     
                     if build_result['exit_code'] != 0:
@@ -213,19 +586,13 @@ class ExecutorService:
                 run_cmd,
                 work_dir,
                 timeout=30,  # MAX_EXECUTION_TIME
-                input_data=stdin
+                input_data=stdin,
+                container=container
             )
             
-            # Normalize status
-            if run_result['status'] == 'timeout':
-                status = 'timeout'
-            elif run_result['exit_code'] != 0:
-                status = 'error'
-            else:
-                status = 'success'
-            
             return {
-                'status': status,
+                # execute_command already reports success/error/timeout
+                'status': run_result['status'],
                 'stdout': run_result['stdout'],
                 'stderr': run_result['stderr'],
                 'exit_code': run_result['exit_code'],
@@ -239,9 +606,11 @@ class ExecutorService:
             }
             
         finally:
-            # Clean up
-            import shutil
-            shutil.rmtree(work_dir, ignore_errors=True)
+            # Clean up and hand the container (or directory) back to its pool
+            if container:
+                await ExecutorService._release_container(language, container)
+            else:
+                await ExecutorService._release_work_dir(language, work_dir)
     
     # Backward compatibility: keep old name
     @staticmethod
@@ -260,219 +629,3 @@ class ExecutorService:
             build_command=custom_build_command,
             run_command=custom_run_command
         )
-    
-    @staticmethod
-    async def execute_python(code: str, input_data: str = "") -> Dict[str, Any]:
-        """Execute Python code in isolated environment."""
-        start_time = time.time()
-        
-        try:
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
-                f.write(code)
-                temp_file = f.name
-            
-            try:
-                # Execute with timeout and resource limits
-                result = subprocess.run(
-                    ['python', temp_file],
-                    input=input_data,
-                    capture_output=True,
-                    text=True,
-                    timeout=CodeExecutor.MAX_EXECUTION_TIME
-                )
-                
-                execution_time = time.time() - start_time
-                
-                return {
-                    'stdout': result.stdout,
-                    'stderr': result.stderr,
-                    'exit_code': result.returncode,
-                    'execution_time': execution_time,
-                    'status': 'success' if result.returncode == 0 else 'error'
-                }
-            finally:
-                # Clean up temp file
-                os.unlink(temp_file)
-                
-        except subprocess.TimeoutExpired:
-            return {
-                'stdout': '',
-                'stderr': f'Execution timed out after {CodeExecutor.MAX_EXECUTION_TIME} seconds',
-                'exit_code': -1,
-                'execution_time': CodeExecutor.MAX_EXECUTION_TIME,
-                'status': 'timeout'
-            }
-        except Exception as e:
-            return {
-                'stdout': '',
-                'stderr': str(e),
-                'exit_code': -1,
-                'execution_time': time.time() - start_time,
-                'status': 'error'
-            }
-    
-    @staticmethod
-    async def execute_java(code: str, input_data: str = "") -> Dict[str, Any]:
-        """Execute Java code in isolated environment."""
-        start_time = time.time()
-        
-        try:
-            # Create temporary directory for Java files
-            temp_dir = tempfile.mkdtemp()
-            
-            # Extract class name from code
-            import re
-            class_match = re.search(r'public\s+class\s+(\w+)', code)
-            if not class_match:
-                return {
-                    'stdout': '',
-                    'stderr': 'No public class found in code',
-                    'exit_code': -1,
-                    'execution_time': 0,
-                    'status': 'error'
-                }
-            
-            class_name = class_match.group(1)
-            java_file = os.path.join(temp_dir, f'{class_name}.java')
-            
-            # Write Java file
-            with open(java_file, 'w') as f:
-                f.write(code)
-            
-            try:
-                # Compile
-                compile_result = subprocess.run(
-                    ['javac', java_file],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
-                
-                if compile_result.returncode != 0:
-                    return {
-                        'stdout': '',
-                        'stderr': f'Compilation error:\n{compile_result.stderr}',
-                        'exit_code': compile_result.returncode,
-                        'execution_time': time.time() - start_time,
-                        'status': 'compilation_error'
-                    }
-                
-                # Execute
-                result = subprocess.run(
-                    ['java', '-cp', temp_dir, class_name],
-                    input=input_data,
-                    capture_output=True,
-                    text=True,
-                    timeout=CodeExecutor.MAX_EXECUTION_TIME
-                )
-                
-                execution_time = time.time() - start_time
-                
-                return {
-                    'stdout': result.stdout,
-                    'stderr': result.stderr,
-                    'exit_code': result.returncode,
-                    'execution_time': execution_time,
-                    'status': 'success' if result.returncode == 0 else 'error'
-                }
-            finally:
-                # Clean up
-                import shutil
-                shutil.rmtree(temp_dir, ignore_errors=True)
-                
-        except subprocess.TimeoutExpired:
-            return {
-                'stdout': '',
-                'stderr': f'Execution timed out after {CodeExecutor.MAX_EXECUTION_TIME} seconds',
-                'exit_code': -1,
-                'execution_time': CodeExecutor.MAX_EXECUTION_TIME,
-                'status': 'timeout'
-            }
-        except Exception as e:
-            return {
-                'stdout': '',
-                'stderr': str(e),
-                'exit_code': -1,
-                'execution_time': time.time() - start_time,
-                'status': 'error'
-            }
-    
-    @staticmethod
-    async def execute_c(code: str, input_data: str = "") -> Dict[str, Any]:
-        """Execute C code in isolated environment."""
-        start_time = time.time()
-        
-        try:
-            # Create temporary files
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.c', delete=False) as f:
-                f.write(code)
-                c_file = f.name
-            
-            exe_file = c_file.replace('.c', '.exe' if os.name == 'nt' else '')
-            
-            try:
-                # Compile
-                compile_result = subprocess.run(
-                    ['gcc', c_file, '-o', exe_file],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
-                
-                if compile_result.returncode != 0:
-                    return {
-                        'stdout': '',
-                        'stderr': f'Compilation error:\n{compile_result.stderr}',
-                        'exit_code': compile_result.returncode,
-                        'execution_time': time.time() - start_time,
-                        'status': 'compilation_error'
-                    }
-                
-                # Execute
-                result = subprocess.run(
-                    [exe_file],
-                    input=input_data,
-                    capture_output=True,
-                    text=True,
-                    timeout=CodeExecutor.MAX_EXECUTION_TIME
-                )
-                
-                execution_time = time.time() - start_time
-                
-                return {
-                    'stdout': result.stdout,
-                    'stderr': result.stderr,
-                    'exit_code': result.returncode,
-                    'execution_time': execution_time,
-                    'status': 'success' if result.returncode == 0 else 'error'
-                }
-            finally:
-                # Clean up
-                if os.path.exists(c_file):
-                    os.unlink(c_file)
-                if os.path.exists(exe_file):
-                    os.unlink(exe_file)
-                
-        except subprocess.TimeoutExpired:
-            return {
-                'stdout': '',
-                'stderr': f'Execution timed out after {CodeExecutor.MAX_EXECUTION_TIME} seconds',
-                'exit_code': -1,
-                'execution_time': CodeExecutor.MAX_EXECUTION_TIME,
-                'status': 'timeout'
-            }
-        except Exception as e:
-            return {
-                'stdout': '',
-                'stderr': str(e),
-                'exit_code': -1,
-                'execution_time': time.time() - start_time,
-                'status': 'error'
-            }
-    
-    @staticmethod
-    async def execute(language: str, code: str, input_data: str = "") -> Dict[str, Any]:
-        """Execute single file code (legacy support)."""
-        files = [{'name': f'main.{language}', 'content': code, 'is_main': True}]
-        return await CodeExecutor.execute_project(language, files, input_data)
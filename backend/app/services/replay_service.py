@@ -1,47 +1,68 @@
+import asyncio
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-import json
-from typing import Dict, Any
-from app.models.models import Attempt, Event, AIInteraction, Run
+from sqlalchemy import select, func
+import orjson
+from typing import Dict, Any, List
+from app.database import async_session_maker
+from app.models.models import Attempt, Event, EventType, AIInteraction, Run
+
+
+def _type_id(name: str):
+    """events.type_id for a type name as a scalar subquery, so type_id indexes still apply."""
+    return select(EventType.id).where(EventType.name == name).scalar_subquery()
 
 
 class ReplayService:
     """Service for replaying student sessions."""
     
+    @staticmethod
+    async def _fetch_rows(stmt) -> List[Dict[str, Any]]:
+        """Run a column SELECT on a separate session and return plain dicts."""
+        async with async_session_maker() as session:
+            result = await session.execute(stmt)
+            return [dict(row) for row in result.mappings()]
+    
     @staticmethod
     async def get_replay_data(attempt_id: int, db: AsyncSession) -> Dict[str, Any]:
         """Get all data needed for replay."""
-        # Get attempt
-        result = await db.execute(select(Attempt).where(Attempt.id == attempt_id))
-        attempt = result.scalar_one_or_none()
+        # An AsyncSession runs one statement at a time, so the three collections
+        # are read on their own short-lived sessions and all four queries overlap.
+        # They are read-only, so they come back as plain dicts of just the columns
+        # the replay schemas return, not ORM instances.
+        attempt_result, events, ai_interactions, runs = await asyncio.gather(
+            db.execute(select(Attempt).where(Attempt.id == attempt_id)),
+            ReplayService._fetch_rows(
+                select(
+                    Event.id, Event.attempt_id, Event.t, Event.seq, EventType.name.label("type"),
+                    Event.file_path, Event.payload_json, Event.created_at,
+                )
+                .join(EventType, Event.type_id == EventType.id)
+                .where(Event.attempt_id == attempt_id)
+                .order_by(Event.seq)
+            ),
+            ReplayService._fetch_rows(
+                select(
+                    AIInteraction.id, AIInteraction.attempt_id, AIInteraction.prompt,
+                    AIInteraction.response, AIInteraction.model_name, AIInteraction.tokens,
+                    AIInteraction.created_at,
+                )
+                .where(AIInteraction.attempt_id == attempt_id)
+                .order_by(AIInteraction.created_at)
+            ),
+            ReplayService._fetch_rows(
+                select(
+                    Run.id, Run.attempt_id, Run.stdout, Run.stderr, Run.exit_code,
+                    Run.run_time, Run.created_at,
+                )
+                .where(Run.attempt_id == attempt_id)
+                .order_by(Run.created_at)
+            ),
+        )
+        attempt = attempt_result.scalar_one_or_none()
         
         if not attempt:
             return None
         
-        # Get events
-        result = await db.execute(
-            select(Event)
-            .where(Event.attempt_id == attempt_id)
-            .order_by(Event.seq)
-        )
-        events = result.scalars().all()
-        
-        # Get AI interactions
-        result = await db.execute(
-            select(AIInteraction)
-            .where(AIInteraction.attempt_id == attempt_id)
-            .order_by(AIInteraction.created_at)
-        )
-        ai_interactions = result.scalars().all()
-        
-        # Get runs
-        result = await db.execute(
-            select(Run)
-            .where(Run.attempt_id == attempt_id)
-            .order_by(Run.created_at)
-        )
-        runs = result.scalars().all()
-        
         return {
             "attempt": attempt,
             "events": events,
@@ -50,9 +71,29 @@ class ReplayService:
         }
     
     @staticmethod
-    def calculate_metrics(events: list) -> Dict[str, Any]:
-        """Calculate engagement metrics from events."""
-        if not events:
+    async def get_metrics(attempt_id: int, db: AsyncSession) -> Dict[str, Any]:
+        """
+        Engagement metrics for an attempt, computed in SQL.
+        
+        Only per-type counts, the typing-time sum and the paste payloads come
+        back over the wire instead of every event row.
+        """
+        result = await db.execute(select(Attempt.id).where(Attempt.id == attempt_id))
+        if result.scalar_one_or_none() is None:
+            return None
+        
+        IDLE_THRESHOLD = 30  # seconds
+        
+        # Event counts per type
+        result = await db.execute(
+            select(EventType.name, func.count())
+            .select_from(Event)
+            .join(EventType, Event.type_id == EventType.id)
+            .where(Event.attempt_id == attempt_id)
+            .group_by(EventType.name)
+        )
+        counts = dict(result.all())
+        if not counts:
             return {
                 "active_typing_time": 0,
                 "paste_count": 0,
@@ -62,48 +103,46 @@ class ReplayService:
                 "session_length": 0
             }
         
-        active_typing_time = 0
-        paste_count = 0
-        total_paste_size = 0
-        ai_interaction_count = 0
-        run_count = 0
-        
-        last_edit_time = None
-        IDLE_THRESHOLD = 30  # seconds
+        # Typing time: gaps between consecutive edits (by seq) under the idle threshold
+        gaps = (
+            select((Event.t - func.lag(Event.t).over(order_by=Event.seq)).label("gap"))
+            .where(Event.attempt_id == attempt_id, Event.type_id == _type_id("edit"))
+            .subquery()
+        )
+        result = await db.execute(
+            select(func.coalesce(func.sum(gaps.c.gap), 0)).where(gaps.c.gap < IDLE_THRESHOLD)
+        )
+        active_typing_time = float(result.scalar_one())
         
-        for event in events:
+        # Paste sizes: payload JSON is only decoded for paste events
+        result = await db.execute(
+            select(Event.payload_json)
+            .where(Event.attempt_id == attempt_id, Event.type_id == _type_id("paste"))
+        )
+        total_paste_size = 0
+        for payload_json in result.scalars():
             try:
-                payload = json.loads(event.payload_json)
-            except (json.JSONDecodeError, TypeError):
+                payload = orjson.loads(payload_json)
+            except (orjson.JSONDecodeError, TypeError):
                 payload = {}
-            
-            if event.type == "edit":
-                if last_edit_time is not None:
-                    time_diff = event.t - last_edit_time
-                    if time_diff < IDLE_THRESHOLD:
-                        active_typing_time += time_diff
-                last_edit_time = event.t
-            
-            elif event.type == "paste":
-                paste_count += 1
-                paste_size = payload.get("size", 0)
-                total_paste_size += paste_size
-            
-            elif event.type in ["ai_prompt", "ai_response"]:
-                ai_interaction_count += 1
-            
-            elif event.type == "run":
-                run_count += 1
+            total_paste_size += payload.get("size", 0)
         
-        avg_paste_size = total_paste_size / paste_count if paste_count > 0 else 0
-        session_length = events[-1].t if events else 0
+        # Session length: timestamp of the last event
+        result = await db.execute(
+            select(Event.t)
+            .where(Event.attempt_id == attempt_id)
+            .order_by(Event.seq.desc())
+            .limit(1)
+        )
+        session_length = result.scalar_one()
         
+        paste_count = counts.get("paste", 0)
         return {
             "active_typing_time": active_typing_time,
             "paste_count": paste_count,
-            "avg_paste_size": avg_paste_size,
-            "ai_interaction_count": ai_interaction_count // 2,  # Divide by 2 (prompt + response)
-            "run_count": run_count,
+            "avg_paste_size": total_paste_size / paste_count if paste_count > 0 else 0,
+            "ai_interaction_count": (counts.get("ai_prompt", 0) + counts.get("ai_response", 0)) // 2,
+            "run_count": counts.get("run", 0),
             "session_length": session_length
         }
 
@@ -0,0 +1,72 @@
+"""
+Cache of execution results for unchanged re-runs.
+
+Students often press Run again without editing anything. Results are keyed by
+language, snapshot hash, stdin and commands, so an identical request can skip
+the build/run entirely. Timeouts are never cached (they depend on load).
+
+Off by default (RUN_CACHE_SIZE=0): a program that uses randomness, the clock
+or input it reads at runtime would get its previous output back. Enable it
+only where runs are known to be deterministic.
+
+Phase 1 uses the in-memory LRU below; the ARQ worker (Phase 2) stores the
+same keys in Redis so every worker process shares them.
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+
+import orjson
+import xxhash
+
+from app.config import settings
+
+CACHEABLE_STATUSES: FrozenSet[str] = frozenset({'success', 'error', 'compilation_error'})
+
+
+def run_cache_key(payload: Dict[str, Any], snapshot_hash: str) -> str:
+    """Key for a run request: everything that can change its output."""
+    return xxhash.xxh3_128(orjson.dumps([
+        payload['language'],
+        snapshot_hash,
+        payload.get('stdin') or '',
+        payload.get('build_command'),
+        payload.get('run_command'),
+    ])).hexdigest()
+
+
+class RunResultCache:
+    """In-memory LRU of run_project results with a per-entry TTL."""
+
+    def __init__(self, max_size: int, ttl: int):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a cached result, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, result = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return result
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        """Cache a result if caching is enabled and its status is deterministic."""
+        if self.max_size <= 0 or result.get('status') not in CACHEABLE_STATUSES:
+            return
+
+        self._entries[key] = (time.monotonic() + self.ttl, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+# Global cache instance (in-process backend)
+run_result_cache = RunResultCache(settings.RUN_CACHE_SIZE, settings.RUN_CACHE_TTL)
@@ -0,0 +1,135 @@
+"""
+Code snapshot serialization for execution runs.
+
+A snapshot is the JSON array of {name, path, content} for every project file.
+It is hashed for content addressing (not as a cryptographic commitment).
+Runs write it once to a content-addressed file store under SNAPSHOT_DIR and
+keep only the hash in the database row.
+"""
+import hashlib
+import os
+import tempfile
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import orjson
+
+try:
+    from blake3 import blake3
+except ImportError:  # blake3 wheel unavailable; fall back to SHA-256
+    blake3 = None
+
+
+# Snapshot hashes are truncated to 128 bits: plenty for content addressing,
+# and runs.snapshot_hash stores them as a 16-byte BLOB
+SNAPSHOT_DIGEST_SIZE = 16
+
+
+def _new_hasher():
+    """BLAKE3 (SIMD, multi-threaded tree hashing) when available, else SHA-256."""
+    if blake3 is not None:
+        return blake3(max_threads=blake3.AUTO)
+    return hashlib.sha256()
+
+
+def _hexdigest(hasher) -> str:
+    """Truncated hex digest (a BLAKE3 digest of that length is the same prefix)."""
+    return hasher.hexdigest()[:2 * SNAPSHOT_DIGEST_SIZE]
+
+
+def _iter_chunks(files: List[Dict[str, str]]) -> Iterator[bytes]:
+    """Yield the snapshot JSON per file, framed so the chunks join to orjson.dumps(list)."""
+    for i, f in enumerate(files):
+        yield (b'[' if i == 0 else b',') + orjson.dumps(
+            {'name': f['name'], 'path': f['path'], 'content': f['content']}
+        )
+    yield b']' if files else b'[]'
+
+
+def snapshot_path(snapshot_dir: str, snapshot_hash: str) -> str:
+    """Location of a stored snapshot: <dir>/<first 2 hex chars>/<hash>."""
+    return os.path.join(snapshot_dir, snapshot_hash[:2], snapshot_hash)
+
+
+def store_snapshot(
+    files: List[Dict[str, str]], snapshot_dir: str, snapshot_hash: Optional[str] = None
+) -> Tuple[str, int]:
+    """
+    Stream a snapshot into the content-addressed store (blocking; run in a thread).
+
+    The JSON is written to a temp file in snapshot_dir while being hashed, then
+    renamed into place with os.replace so readers never see a partial file.
+    Identical snapshots (re-runs of unchanged code) are stored only once; when
+    the caller already knows the hash (computed at enqueue) and it is stored,
+    nothing is serialized or written at all.
+
+    Returns:
+        (snapshot_hash, size in bytes)
+    """
+    if snapshot_hash:
+        try:
+            return snapshot_hash, os.path.getsize(snapshot_path(snapshot_dir, snapshot_hash))
+        except OSError:
+            pass  # not stored yet
+
+    os.makedirs(snapshot_dir, exist_ok=True)
+    hasher = _new_hasher()
+    size = 0
+
+    fd, tmp_path = tempfile.mkstemp(dir=snapshot_dir, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as tmp:
+            for data in _iter_chunks(files):
+                hasher.update(data)
+                tmp.write(data)
+                size += len(data)
+
+        snapshot_hash = _hexdigest(hasher)
+        path = snapshot_path(snapshot_dir, snapshot_hash)
+        if os.path.exists(path):
+            os.unlink(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    return snapshot_hash, size
+
+
+def build_snapshot(files: List[Dict[str, str]], threshold: int) -> Tuple[str, Optional[str], int]:
+    """
+    Hash and measure a project snapshot one file at a time.
+
+    Each file is encoded separately with orjson and streamed into the hasher
+    with the same framing orjson.dumps() produces for the whole list, so the
+    hash matches hashing the full JSON without holding it in memory.
+
+    Returns:
+        (snapshot_hash, snapshot_json or None if larger than threshold, size in bytes)
+    """
+    hasher = _new_hasher()
+    size = 0
+
+    # Cheap lower bound (JSON escaping and UTF-8 only add bytes): when the raw
+    # strings already exceed the threshold, don't collect chunks at all
+    raw_total = sum(
+        len(f['name']) + len(f['path']) + len(f['content'])
+        for f in files
+    )
+    chunks: Optional[List[bytes]] = [] if raw_total <= threshold else None
+
+    for data in _iter_chunks(files):
+        hasher.update(data)
+        size += len(data)
+
+        if chunks is not None:
+            if size <= threshold:
+                chunks.append(data)
+            else:
+                chunks = None
+
+    if chunks is not None:
+        return _hexdigest(hasher), b''.join(chunks).decode('utf-8'), size
+    return _hexdigest(hasher), None, size
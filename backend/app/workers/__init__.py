@@ -8,7 +8,6 @@ This worker consumes jobs from Redis and executes them, persisting results to DB
 """
 import logging
 import json
-import hashlib
 from datetime import datetime
 from typing import Dict, Any
 from arq import cron
@@ -18,6 +17,7 @@ from app.config import settings
 from app.database import async_session_maker
 from app.models.models import Run, RunStatus, Attempt
 from app.services.executor_service import ExecutorService
+from app.services.snapshot_service import build_snapshot
 
 logger = logging.getLogger(__name__)
 
@@ -75,14 +75,10 @@ async def execute_run_job(ctx: Dict[str, Any], run_id: int) -> Dict[str, Any]:
             }
             final_status = status_map.get(result['status'], RunStatus.ERROR)
             
-            # Store snapshot if under threshold
-            snapshot_json = json.dumps([
-                {'name': f['name'], 'path': f['path'], 'content': f['content']}
-                for f in payload['files']
-            ])
-            snapshot_size = len(snapshot_json.encode('utf-8'))
-            code_snapshot = snapshot_json if snapshot_size <= settings.SNAPSHOT_SIZE_THRESHOLD else None
-            snapshot_hash = hashlib.sha256(snapshot_json.encode()).hexdigest()
+            # Store snapshot if under threshold (hash sized for runs.snapshot_hash)
+            snapshot_hash, code_snapshot, _ = build_snapshot(
+                payload['files'], settings.SNAPSHOT_SIZE_THRESHOLD
+            )
             
             # Calculate times
             build_time = result.get('build_result', {}).get('execution_time') if result.get('build_result') else None
@@ -6,9 +6,9 @@ Run as separate process:
 
 This worker consumes jobs from Redis and executes them, persisting results to DB.
 """
+import asyncio
 import logging
-import json
-import hashlib
+import orjson
 from datetime import datetime
 from typing import Dict, Any
 from arq import cron
@@ -18,6 +18,8 @@ from app.config import settings
 from app.database import async_session_maker
 from app.models.models import Run, RunStatus, Attempt
 from app.services.executor_service import ExecutorService
+from app.services.snapshot_service import store_snapshot
+from app.services.result_cache import CACHEABLE_STATUSES, run_cache_key
 
 logger = logging.getLogger(__name__)
 
@@ -43,7 +45,7 @@ async def execute_run_job(ctx: Dict[str, Any], run_id: int) -> Dict[str, Any]:
             
             # Parse request payload
             try:
-                payload = json.loads(db_run.request_json)
+                payload = orjson.loads(db_run.request_json)
             except Exception as e:
                 logger.error(f"[Worker] Failed to parse request for run {run_id}: {e}")
                 db_run.status = RunStatus.ERROR
@@ -52,20 +54,38 @@ async def execute_run_job(ctx: Dict[str, Any], run_id: int) -> Dict[str, Any]:
                 await session.commit()
                 return {"status": "error", "message": f"Invalid request: {str(e)}"}
             
-            # Update status to running
-            db_run.status = RunStatus.RUNNING
-            db_run.started_at = datetime.utcnow()
-            await session.commit()
-            
-            # Execute the code
-            result = await ExecutorService.run_project(
-                language=payload['language'],
-                files=payload['files'],
-                stdin=payload.get('stdin', ''),
-                build_command=payload.get('build_command'),
-                run_command=payload.get('run_command'),
+            # Write the snapshot to the content-addressed store (deduplicated by hash)
+            snapshot_hash, snapshot_size = await asyncio.to_thread(
+                store_snapshot, payload['files'], settings.SNAPSHOT_DIR, db_run.snapshot_hash
             )
             
+            # Unchanged re-run: reuse the previous result (shared across workers via Redis)
+            cache_key = f"run:{run_cache_key(payload, snapshot_hash)}"
+            cached = await ctx['redis'].get(cache_key) if settings.RUN_CACHE_SIZE > 0 else None
+            
+            if cached is not None:
+                # Nothing ran: the run never enters RUNNING and takes no time
+                logger.info(f"[Worker] Run {run_id} served from result cache")
+                result = orjson.loads(cached)
+                db_run.started_at = db_run.finished_at = datetime.utcnow()
+            else:
+                # Update status to running
+                db_run.status = RunStatus.RUNNING
+                db_run.started_at = datetime.utcnow()
+                await session.commit()
+                
+                # Execute the code
+                result = await ExecutorService.run_project(
+                    language=payload['language'],
+                    files=payload['files'],
+                    stdin=payload.get('stdin', ''),
+                    build_command=payload.get('build_command'),
+                    run_command=payload.get('run_command'),
+                )
+                if settings.RUN_CACHE_SIZE > 0 and result['status'] in CACHEABLE_STATUSES:
+                    await ctx['redis'].set(cache_key, orjson.dumps(result), ex=settings.RUN_CACHE_TTL)
+                db_run.finished_at = datetime.utcnow()
+            
             # Determine final status
             status_map = {
                 'success': RunStatus.SUCCESS,
@@ -75,15 +95,6 @@ async def execute_run_job(ctx: Dict[str, Any], run_id: int) -> Dict[str, Any]:
             }
             final_status = status_map.get(result['status'], RunStatus.ERROR)
             
-            # Store snapshot if under threshold
-            snapshot_json = json.dumps([
-                {'name': f['name'], 'path': f['path'], 'content': f['content']}
-                for f in payload['files']
-            ])
-            snapshot_size = len(snapshot_json.encode('utf-8'))
-            code_snapshot = snapshot_json if snapshot_size <= settings.SNAPSHOT_SIZE_THRESHOLD else None
-            snapshot_hash = hashlib.sha256(snapshot_json.encode()).hexdigest()
-            
             # Calculate times
             build_time = result.get('build_result', {}).get('execution_time') if result.get('build_result') else None
             run_time = result.get('execution_time')
@@ -91,8 +102,6 @@ async def execute_run_job(ctx: Dict[str, Any], run_id: int) -> Dict[str, Any]:
             
             # Update run with results
             db_run.status = final_status
-            db_run.finished_at = datetime.utcnow()
-            db_run.code_snapshot = code_snapshot
             db_run.snapshot_hash = snapshot_hash
             
             # Build output
@@ -140,11 +149,15 @@ async def execute_run_job(ctx: Dict[str, Any], run_id: int) -> Dict[str, Any]:
 async def startup(ctx: Dict[str, Any]) -> None:
     """Called when worker starts."""
     logger.info(f"[Worker] Starting ARQ worker (redis={settings.REDIS_URL})")
+    ExecutorService.prefill_work_dirs()
+    if settings.WARM_CONTAINERS_PER_LANG > 0:
+        await ExecutorService.start_container_pool()
 
 
 async def shutdown(ctx: Dict[str, Any]) -> None:
     """Called when worker shuts down."""
     logger.info("[Worker] Shutting down ARQ worker")
+    await ExecutorService.stop_container_pool()
 
 
 class WorkerSettings:
@@ -3,10 +3,9 @@ Script to create test users in the database.
 Run this after recreating the database.
 """
 import asyncio
-from app.database import get_db, engine, Base
+from app.database import async_session_maker, engine, Base
 from app.models.models import User, UserRole
 from app.auth_utils import get_password_hash
-from sqlalchemy.ext.asyncio import AsyncSession
 
 
 async def create_test_users():
@@ -15,35 +14,39 @@ async def create_test_users():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     
-    async for db in get_db():
+    # bcrypt is deliberately slow; hash both passwords in parallel threads
+    teacher_hash, student_hash = await asyncio.gather(
+        asyncio.to_thread(get_password_hash, "password123"),
+        asyncio.to_thread(get_password_hash, "password123"),
+    )
+    
+    async with async_session_maker() as db:
         # Create teacher
         teacher = User(
             username="kkraso01prof",
             email="teacher@cognicode.com",
-            password_hash=get_password_hash("password123"),
+            password_hash=teacher_hash,
             role=UserRole.TEACHER
         )
-        db.add(teacher)
         
         # Create student
         student = User(
             username="kkraso01",
             email="student@cognicode.com",
-            password_hash=get_password_hash("password123"),
+            password_hash=student_hash,
             role=UserRole.STUDENT
         )
-        db.add(student)
         
+        db.add_all([teacher, student])
         await db.commit()
-        print(" Test users created successfully!")
-        print("\nTeacher account:")
-        print("  Username: kkraso01prof")
-        print("  Password: password123")
-        print("\nStudent account:")
-        print("  Username: kkraso01")
-        print("  Password: password123")
-        break
-
+    
+    print(" Test users created successfully!")
+    print("\nTeacher account:")
+    print("  Username: kkraso01prof")
+    print("  Password: password123")
+    print("\nStudent account:")
+    print("  Username: kkraso01")
+    print("  Password: password123")
 
 if __name__ == "__main__":
     asyncio.run(create_test_users())
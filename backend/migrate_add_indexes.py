@@ -3,18 +3,67 @@ Database migration script to add performance indexes and file_path column.
 
 This script adds:
 1. file_path column to events table (for multi-file support)
-2. Performance indexes for 10-100 faster queries
-3. Backwards compatible - safe to run on existing database
+2. event_types dictionary table (events.type TEXT -> events.type_id)
+3. Performance indexes for 10-100 faster queries
+4. Backwards compatible - safe to run on existing database
 
 Run with: python migrate_add_indexes.py
 """
 
+import functools
+import io
+import re
 import sqlite3
 import os
+import sys
+from contextlib import redirect_stdout
 from pathlib import Path
 
 DB_PATH = Path(__file__).parent / "cognicode.db"
 
+SEP = "=" * 60
+
+
+def buffered_output(func):
+    """
+    Collect everything func prints and hand it to stdout in one write, instead
+    of a write (and flush, when stdout is a terminal) per print() call.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        out = io.StringIO()
+        try:
+            with redirect_stdout(out):
+                return func(*args, **kwargs)
+        finally:
+            sys.stdout.write(out.getvalue())
+            sys.stdout.flush()
+    return wrapper
+
+
+def count_events(cursor):
+    """
+    Row count of events from sqlite_stat1 (written by ANALYZE) instead of a
+    full-table COUNT(*). The first number of a full index's stat is the
+    table's row count; falls back to COUNT(*) when no statistics exist yet.
+    """
+    try:
+        cursor.execute("""
+            SELECT stat FROM sqlite_stat1
+            WHERE tbl = 'events' AND (idx IS NULL OR idx = 'idx_events_attempt_seq')
+        """)
+        row = cursor.fetchone()
+    except sqlite3.OperationalError:
+        row = None  # sqlite_stat1 only exists after the first ANALYZE
+    
+    if row:
+        return int(row[0].split()[0])
+    
+    cursor.execute("SELECT COUNT(*) FROM events")
+    return cursor.fetchone()[0]
+
+
+@buffered_output
 def migrate_database():
     """Add indexes and file_path column to existing database."""
     
@@ -30,26 +79,27 @@ def migrate_database():
     cursor = conn.cursor()
     
     try:
-        # Check if file_path column exists
-        cursor.execute("PRAGMA table_info(events)")
-        columns = [row[1] for row in cursor.fetchall()]
-        
-        if 'file_path' not in columns:
-            print(" Adding file_path column to events table...")
-            cursor.execute("""
-                ALTER TABLE events 
-                ADD COLUMN file_path VARCHAR(500)
-            """)
-            print("    file_path column added")
-        else:
+        # Add file_path directly; a duplicate-column error means it already exists
+        # (cheaper than parsing PRAGMA table_info). ADD COLUMN only touches the
+        # schema, so it can run ahead of the batch below.
+        try:
+            cursor.execute("ALTER TABLE events ADD COLUMN file_path VARCHAR(500)")
+            print(" Added file_path column to events table")
+        except sqlite3.OperationalError as e:
+            if 'duplicate column' not in str(e):
+                raise
             print("     file_path column already exists")
         
-        # Get existing indexes
+        # Probe existing indexes: decides which drops go into the script below
         cursor.execute("""
-            SELECT name FROM sqlite_master 
+            SELECT name, sql FROM sqlite_master 
             WHERE type='index' AND tbl_name='events'
         """)
-        existing_indexes = {row[0] for row in cursor.fetchall()}
+        existing_indexes = dict(cursor.fetchall())
+        
+        # Databases created before event_types still carry the type name per row
+        cursor.execute("SELECT 1 FROM pragma_table_info('events') WHERE name = 'type'")
+        has_type_text = cursor.fetchone() is not None
         
         # Define indexes to create
         indexes_to_create = [
@@ -59,22 +109,60 @@ def migrate_database():
                 'description': 'Fast replay queries (attempt_id + seq)'
             },
             {
-                'name': 'idx_events_attempt_time',
-                'sql': 'CREATE INDEX IF NOT EXISTS idx_events_attempt_time ON events(attempt_id, t)',
-                'description': 'Time-based queries (attempt_id + timestamp)'
+                'name': 'idx_events_type_id',
+                'sql': 'CREATE INDEX IF NOT EXISTS idx_events_type_id ON events(type_id, attempt_id, seq)',
+                'description': 'Event type filtering (covering)'
             },
             {
-                'name': 'idx_events_type',
-                'sql': 'CREATE INDEX IF NOT EXISTS idx_events_type ON events(type)',
-                'description': 'Event type filtering'
+                'name': 'idx_events_file',
+                'sql': 'CREATE INDEX IF NOT EXISTS idx_events_file ON events(file_path, attempt_id, seq) WHERE file_path IS NOT NULL',
+                'description': 'Multi-file project queries (partial, skips NULL file_path)'
             },
             {
-                'name': 'idx_events_file',
-                'sql': 'CREATE INDEX IF NOT EXISTS idx_events_file ON events(file_path)',
-                'description': 'Multi-file project queries'
+                'name': 'idx_events_attempt_type_seq',
+                'sql': 'CREATE INDEX IF NOT EXISTS idx_events_attempt_type_seq ON events(attempt_id, type_id, seq, t)',
+                'description': 'Replay metrics aggregation (covering)'
             }
         ]
         
+        # Earlier runs created v_events_replay, pinned with INDEXED BY. Nothing
+        # reads it, and it fails every query once that index is gone
+        statements = ["DROP VIEW IF EXISTS v_events_replay"]
+        
+        if has_type_text:
+            # DROP COLUMN needs SQLite 3.35+; checked up front so nothing is half-applied
+            if sqlite3.sqlite_version_info < (3, 35, 0):
+                raise RuntimeError(
+                    f"SQLite {sqlite3.sqlite_version} cannot drop events.type (3.35+ required)"
+                )
+            print("    Moving events.type into the event_types table")
+            statements += [
+                "CREATE TABLE IF NOT EXISTS event_types ("
+                "id INTEGER NOT NULL PRIMARY KEY, name VARCHAR(50) NOT NULL UNIQUE)",
+                "INSERT OR IGNORE INTO event_types (name) SELECT DISTINCT type FROM events",
+                "ALTER TABLE events ADD COLUMN type_id INTEGER REFERENCES event_types (id)",
+                "UPDATE events SET type_id = "
+                "(SELECT id FROM event_types WHERE event_types.name = events.type)",
+            ]
+            for name in ('idx_events_type', 'idx_events_type_attempt_seq', 'idx_events_attempt_type_seq'):
+                if name in existing_indexes:
+                    print(f"    Dropping {name} (rebuilt on type_id)")
+                    statements.append(f"DROP INDEX IF EXISTS {name}")
+                    del existing_indexes[name]
+            statements.append("ALTER TABLE events DROP COLUMN type")
+        
+        # seq is monotonic with t within an attempt, so (attempt_id, seq) serves
+        # time-ordered reads and this index only added insert cost
+        if 'idx_events_attempt_time' in existing_indexes:
+            print("    Dropping idx_events_attempt_time (covered by idx_events_attempt_seq)")
+            statements.append("DROP INDEX IF EXISTS idx_events_attempt_time")
+        
+        # Older databases have idx_events_file over every row, NULL file_path included
+        if 'idx_events_file' in existing_indexes and 'WHERE' not in (existing_indexes['idx_events_file'] or ''):
+            print("    Dropping idx_events_file (rebuilt as a partial index)")
+            statements.append("DROP INDEX IF EXISTS idx_events_file")
+            del existing_indexes['idx_events_file']
+        
         print()
         print(" Creating performance indexes...")
         
@@ -84,21 +172,43 @@ def migrate_database():
                 print(f"     {idx['name']} already exists")
             else:
                 print(f"    Creating {idx['name']}: {idx['description']}")
-                cursor.execute(idx['sql'])
                 created_count += 1
-                print(f"    {idx['name']} created")
+            # IF NOT EXISTS makes this a no-op for the ones already there
+            statements.append(idx['sql'])
         
-        # Commit all changes
-        conn.commit()
+        print()
+        print(" Applying changes and analyzing events table...")
         
-        # Get database stats
-        cursor.execute("SELECT COUNT(*) FROM events")
-        event_count = cursor.fetchone()[0]
+        # One executescript call runs everything:
+        # - WAL + NORMAL sync and a large in-memory sort area for the index builds.
+        #   SQLite allows one writer at a time, so the builds cannot overlap across
+        #   connections; threads lets each build sort on several helper threads.
+        # - One write transaction (and one fsync) for every index change.
+        #   It is opened inside the script because executescript commits any
+        #   transaction that is already pending.
+        # - ANALYZE refreshes planner statistics (sqlite_stat1, plus stat4 where
+        #   compiled in) so the new indexes are costed by real selectivity.
+        body = ";\n".join(statements)
+        cursor.executescript(f"""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA cache_size=-262144;
+            PRAGMA threads={min(4, os.cpu_count() or 1)};
+            BEGIN IMMEDIATE;
+            {body};
+            ANALYZE events;
+            COMMIT;
+            PRAGMA optimize;
+        """)
+        
+        # Get database stats (from the statistics ANALYZE just wrote)
+        event_count = count_events(cursor)
         
         print()
-        print("=" * 60)
+        print(SEP)
         print(" Migration completed successfully!")
-        print("=" * 60)
+        print(SEP)
         print(f"   Database: {DB_PATH}")
         print(f"   Events in database: {event_count:,}")
         print(f"   Indexes created: {created_count}")
@@ -130,6 +240,7 @@ def migrate_database():
         conn.close()
 
 
+@buffered_output
 def verify_indexes():
     """Verify that indexes were created successfully."""
     
@@ -152,7 +263,10 @@ def verify_indexes():
         if indexes:
             print(" Current indexes on events table:")
             for name, sql in indexes:
-                print(f"    {name}")
+                if name in ('idx_events_attempt_time', 'idx_events_type', 'idx_events_type_attempt_seq'):
+                    print(f"    {name} (superseded, re-run the migration to drop it)")
+                else:
+                    print(f"    {name}")
         else:
             print("  No custom indexes found on events table")
             
@@ -160,57 +274,130 @@ def verify_indexes():
         conn.close()
 
 
+# Queries whose plans show_query_plan checks: (title, query, expected index, hint on a sort step)
+QUERY_PLAN_PROBES = [
+    (
+        "Replay query",
+        "SELECT * FROM events WHERE attempt_id = 1 ORDER BY seq",
+        'idx_events_attempt_seq',
+        None,
+    ),
+    (
+        "Type filter",
+        "SELECT attempt_id, seq FROM events WHERE type_id = 1",
+        'COVERING INDEX idx_events_type_id',
+        None,
+    ),
+    (
+        "File filter",
+        "SELECT * FROM events WHERE file_path = 'src/main.py'",
+        'idx_events_file',
+        None,
+    ),
+    (
+        # Time window, ordered by seq (no idx_events_attempt_time any more)
+        "Time window",
+        "SELECT * FROM events WHERE attempt_id = 1 AND t <= 60 ORDER BY seq",
+        'idx_events_attempt_seq',
+        "consider an (attempt_id, t) index",
+    ),
+    (
+        # Next queued run for an attempt (runs index from the Phase 1 migration)
+        "Queued runs",
+        "SELECT * FROM runs WHERE attempt_id = 1 AND status = 0 ORDER BY created_at",
+        'idx_runs_attempt_status_created',
+        "idx_runs_attempt_status_created is missing",
+    ),
+]
+
+# Precompiled once: every expected index name in one alternation (longest
+# first), bare full-table scans ('SCAN TABLE x' before SQLite 3.36), and
+# temp B-tree sorts
+_PLAN_INDEX_RE = re.compile('|'.join(
+    re.escape(name)
+    for name in sorted({expected for _, _, expected, _ in QUERY_PLAN_PROBES}, key=len, reverse=True)
+))
+_FULL_SCAN_RE = re.compile(r'^SCAN (?:TABLE )?\S+$', re.MULTILINE)
+_TEMP_SORT_RE = re.compile(r'TEMP B-TREE')
+
+
+@buffered_output
 def show_query_plan():
-    """Show query execution plan to verify index usage."""
+    """
+    Show query execution plans to verify index usage.
+    
+    Returns False if any probe falls back to a full table scan, so the script
+    can be used as a check (exit code 1).
+    """
     
     if not DB_PATH.exists():
-        return
+        return True
     
-    conn = sqlite3.connect(DB_PATH)
+    # Autocommit: the probes are read-only and need no transaction around them
+    conn = sqlite3.connect(DB_PATH, isolation_level=None)
     cursor = conn.cursor()
     
     try:
-        # Check if we have any data
-        cursor.execute("SELECT COUNT(*) FROM events")
-        event_count = cursor.fetchone()[0]
+        # Check if we have any data (stops at the first row, no full scan)
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM events)")
+        has_events = cursor.fetchone()[0]
         
-        if event_count == 0:
+        if not has_events:
             print("  No events in database yet. Indexes will be used once data is added.")
-            return
+            return True
         
         print()
-        print(" Query Execution Plans (verify index usage):")
+        print(" Planner statistics (sqlite_stat1):")
+        try:
+            cursor.execute("SELECT idx, stat FROM sqlite_stat1 WHERE tbl = 'events' ORDER BY idx")
+            stats = cursor.fetchall()
+        except sqlite3.OperationalError:
+            stats = []  # sqlite_stat1 only exists after the first ANALYZE
+        for idx, stat in stats:
+            print(f"   {idx or '(table)'}: {stat}")
+        if not stats:
+            print("    No statistics yet - run the migration to ANALYZE events")
+        
         print()
+        print(" Query Execution Plans (verify index usage):")
         
-        # Test query 1: Replay query
-        print("1  Replay query (SELECT * FROM events WHERE attempt_id = 1 ORDER BY seq):")
-        cursor.execute("EXPLAIN QUERY PLAN SELECT * FROM events WHERE attempt_id = 1 ORDER BY seq")
-        plan = cursor.fetchall()
-        for row in plan:
-            print(f"   {row}")
-            if 'idx_events_attempt_seq' in str(row):
-                print("    Using idx_events_attempt_seq index (FAST!)")
+        full_scans = []
+        for number, (title, sql, expected, sort_hint) in enumerate(QUERY_PLAN_PROBES, start=1):
+            print()
+            print(f"{number}  {title} ({sql}):")
+            cursor.execute("EXPLAIN QUERY PLAN " + sql)
+            rows = cursor.fetchall()
+            for row in rows:
+                print(f"   {row}")
+            
+            # One regex pass over the whole plan text
+            plan_text = "\n".join(row[3] for row in rows)
+            if expected in _PLAN_INDEX_RE.findall(plan_text):
+                print(f"    Using {expected} (FAST!)")
+            if _FULL_SCAN_RE.search(plan_text):
+                print("    Full table scan (SLOW!)")
+                full_scans.append(title)
+            if sort_hint and _TEMP_SORT_RE.search(plan_text):
+                print(f"    Sorting in a temp B-tree: {sort_hint}")
         
-        print()
+        if full_scans:
+            print()
+            print(f" Full table scans in: {', '.join(full_scans)}")
+            return False
         
-        # Test query 2: Type filter
-        print("2  Type filter (SELECT * FROM events WHERE type = 'paste'):")
-        cursor.execute("EXPLAIN QUERY PLAN SELECT * FROM events WHERE type = 'paste'")
-        plan = cursor.fetchall()
-        for row in plan:
-            print(f"   {row}")
-            if 'idx_events_type' in str(row):
-                print("    Using idx_events_type index (FAST!)")
+        return True
         
     finally:
         conn.close()
 
 
-if __name__ == '__main__':
+@buffered_output
+def main():
+    """Run the migration and checks; returns the process exit code."""
     print()
-    print("=" * 60)
+    print(SEP)
     print("  COGNICODE Database Migration: Performance Indexes")
-    print("=" * 60)
+    print(SEP)
     print()
     
     success = migrate_database()
@@ -220,8 +407,14 @@ if __name__ == '__main__':
         verify_indexes()
         
         print()
-        show_query_plan()
+        plans_ok = show_query_plan()
     
     print()
-    print("=" * 60)
+    print(SEP)
+    
+    return 0 if success and plans_ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
 
@@ -0,0 +1,81 @@
+"""
+Alembic migration for dictionary-encoded event types.
+Moves the event type name out of every events row into an event_types
+table referenced by a small integer events.type_id.
+
+Revision ID: 003_event_types
+Revises: 002_phase1_execution_queue
+Create Date: 2026-10-15
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '003_event_types'
+down_revision = '002_phase1_execution_queue'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Apply migration."""
+    
+    # 1. Dictionary table, filled from the names already in use
+    op.create_table(
+        'event_types',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('name', sa.String(50), nullable=False, unique=True),
+    )
+    op.execute("INSERT INTO event_types (name) SELECT DISTINCT type FROM events")
+    
+    # 2. Point every event at its name
+    op.add_column('events', sa.Column('type_id', sa.Integer(), nullable=True))
+    op.execute(
+        "UPDATE events SET type_id = "
+        "(SELECT id FROM event_types WHERE event_types.name = events.type)"
+    )
+    
+    # 3. Drop whatever still refers to the text column (created by
+    # migrate_add_indexes.py or create_all, so they may not exist)
+    op.execute("DROP VIEW IF EXISTS v_events_replay")
+    op.execute("DROP INDEX IF EXISTS idx_events_type")
+    op.execute("DROP INDEX IF EXISTS idx_events_type_attempt_seq")
+    op.execute("DROP INDEX IF EXISTS idx_events_attempt_type_seq")
+    
+    # 4. One batch block (a single rebuild on SQLite): drop the text column,
+    # make type_id required and reference event_types
+    with op.batch_alter_table('events', recreate='auto') as batch_op:
+        batch_op.drop_column('type')
+        batch_op.alter_column('type_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key('fk_events_type_id', 'event_types', ['type_id'], ['id'])
+    
+    # 5. Type indexes, now on type_id
+    op.create_index('idx_events_type_id', 'events', ['type_id', 'attempt_id', 'seq'])
+    op.create_index('idx_events_attempt_type_seq', 'events', ['attempt_id', 'type_id', 'seq', 't'])
+
+
+def downgrade():
+    """Revert migration."""
+    
+    op.drop_index('idx_events_attempt_type_seq', table_name='events')
+    op.drop_index('idx_events_type_id', table_name='events')
+    op.execute("DROP VIEW IF EXISTS v_events_replay")
+    
+    # Restore the name on every row
+    op.add_column('events', sa.Column('type', sa.String(50), nullable=True))
+    op.execute(
+        "UPDATE events SET type = "
+        "(SELECT name FROM event_types WHERE event_types.id = events.type_id)"
+    )
+    
+    with op.batch_alter_table('events', recreate='auto') as batch_op:
+        batch_op.drop_constraint('fk_events_type_id', type_='foreignkey')
+        batch_op.drop_column('type_id')
+        batch_op.alter_column('type', existing_type=sa.String(50), nullable=False)
+    
+    op.create_index('idx_events_attempt_type_seq', 'events', ['attempt_id', 'type', 'seq', 't'])
+    op.create_index('idx_events_type_attempt_seq', 'events', ['type', 'attempt_id', 'seq'])
+    
+    op.drop_table('event_types')
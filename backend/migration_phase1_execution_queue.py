@@ -25,45 +25,57 @@ def upgrade():
     # For SQLite, this will be handled as text
     
     # 2. Add new columns to runs table
-    op.add_column('runs', sa.Column('status', sa.String(50), nullable=False, server_default='queued'))
-    op.add_column('runs', sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()))
-    op.add_column('runs', sa.Column('started_at', sa.DateTime(), nullable=True))
-    op.add_column('runs', sa.Column('finished_at', sa.DateTime(), nullable=True))
-    
-    # Build phase columns
-    op.add_column('runs', sa.Column('build_stdout', sa.Text(), nullable=True))
-    op.add_column('runs', sa.Column('build_stderr', sa.Text(), nullable=True))
-    op.add_column('runs', sa.Column('build_exit_code', sa.Integer(), nullable=True))
-    op.add_column('runs', sa.Column('build_time', sa.Float(), nullable=True))
-    
-    # Add hash and snapshot columns
-    op.add_column('runs', sa.Column('snapshot_hash', sa.String(64), nullable=True))
-    op.add_column('runs', sa.Column('request_json', sa.Text(), nullable=True))
-    
-    # 3. Rename code_snapshot to be optional (already exists, just update constraints)
-    # This is implicit: code_snapshot was NOT NULL, now it becomes nullable
-    # You may need to manually update this in your DB if it's marked NOT NULL
+    # One batch block: on SQLite, the code_snapshot change (and the non-constant
+    # created_at default) needs a table rebuild, and batch mode copies runs once
+    # for every op below instead of once per op
+    with op.batch_alter_table('runs', recreate='auto') as batch_op:
+        batch_op.add_column(sa.Column('status', sa.String(50), nullable=False, server_default='queued'))
+        batch_op.add_column(sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()))
+        batch_op.add_column(sa.Column('started_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('finished_at', sa.DateTime(), nullable=True))
+        
+        # Build phase columns
+        batch_op.add_column(sa.Column('build_stdout', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('build_stderr', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('build_exit_code', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('build_time', sa.Float(), nullable=True))
+        
+        # Add hash and snapshot columns
+        batch_op.add_column(sa.Column('snapshot_hash', sa.String(64), nullable=True))
+        batch_op.add_column(sa.Column('request_json', sa.Text(), nullable=True))
+        
+        # 3. code_snapshot was NOT NULL, now it becomes optional
+        batch_op.alter_column('code_snapshot', existing_type=sa.Text(), nullable=True)
     
     # 4. Create indexes for job querying
-    op.create_index('idx_runs_attempt_status', 'runs', ['attempt_id', 'status'])
-    op.create_index('idx_runs_created', 'runs', ['created_at'])
+    # (attempt_id, status) lookups, ordered by created_at without a sort step
+    op.create_index('idx_runs_attempt_status_created', 'runs', ['attempt_id', 'status', 'created_at'])
+    
+    # Runs of identical files (partial: legacy rows have no hash)
+    op.create_index(
+        'idx_runs_snapshot_hash', 'runs', ['snapshot_hash'],
+        sqlite_where=sa.text('snapshot_hash IS NOT NULL'),
+        postgresql_where=sa.text('snapshot_hash IS NOT NULL'),
+    )
 
 
 def downgrade():
     """Revert migration."""
     
     # Remove indexes
-    op.drop_index('idx_runs_created', table_name='runs')
-    op.drop_index('idx_runs_attempt_status', table_name='runs')
+    op.drop_index('idx_runs_snapshot_hash', table_name='runs')
+    op.drop_index('idx_runs_attempt_status_created', table_name='runs')
     
-    # Remove new columns
-    op.drop_column('runs', 'request_json')
-    op.drop_column('runs', 'snapshot_hash')
-    op.drop_column('runs', 'build_time')
-    op.drop_column('runs', 'build_exit_code')
-    op.drop_column('runs', 'build_stderr')
-    op.drop_column('runs', 'build_stdout')
-    op.drop_column('runs', 'finished_at')
-    op.drop_column('runs', 'started_at')
-    op.drop_column('runs', 'created_at')
-    op.drop_column('runs', 'status')
+    # Remove new columns (one rebuild, as in upgrade). code_snapshot stays
+    # nullable: runs stored since this migration may have no inline snapshot
+    with op.batch_alter_table('runs', recreate='auto') as batch_op:
+        batch_op.drop_column('request_json')
+        batch_op.drop_column('snapshot_hash')
+        batch_op.drop_column('build_time')
+        batch_op.drop_column('build_exit_code')
+        batch_op.drop_column('build_stderr')
+        batch_op.drop_column('build_stdout')
+        batch_op.drop_column('finished_at')
+        batch_op.drop_column('started_at')
+        batch_op.drop_column('created_at')
+        batch_op.drop_column('status')
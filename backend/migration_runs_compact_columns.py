@@ -0,0 +1,185 @@
+"""
+Alembic migration for compact runs column storage.
+Converts runs columns from the types revision 002 (or create_all) gave them
+to the storage the Run model now uses:
+- status: RunStatus name (runstatus ENUM / VARCHAR) -> SMALLINT RunStatusCode
+- build_stdout, build_stderr, request_json: TEXT -> BLOB (ZstdText). Existing
+  rows become their UTF-8 bytes, which ZstdText reads back as they are; only
+  new rows are compressed
+- snapshot_hash: 64-char hex VARCHAR -> 16-byte BLOB (HexDigest(16)), keeping
+  the first 128 bits of each legacy SHA-256 as snapshot_service does
+
+Revision ID: 004_runs_compact_columns
+Revises: 003_event_types
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+import sqlalchemy as sa
+import zstandard
+
+
+# revision identifiers, used by Alembic.
+revision = '004_runs_compact_columns'
+down_revision = '003_event_types'
+branch_labels = None
+depends_on = None
+
+
+# RunStatusCode in app.models.models, frozen here as of this revision
+STATUS_CODES = {
+    'QUEUED': 0,
+    'RUNNING': 1,
+    'SUCCESS': 2,
+    'ERROR': 3,
+    'TIMEOUT': 4,
+    'COMPILATION_ERROR': 5,
+    'CANCELLED': 6,
+}
+
+ZSTD_COLUMNS = ('build_stdout', 'build_stderr', 'request_json')
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+DIGEST_SIZE = 16  # SNAPSHOT_DIGEST_SIZE in app.services.snapshot_service
+
+
+def _status_to_code(column):
+    """CASE mapping a status name to its code; accepts names ('QUEUED') and values ('queued')."""
+    whens = " ".join(f"WHEN '{name}' THEN {code}" for name, code in STATUS_CODES.items())
+    return f"CASE upper({column}) {whens} END"
+
+
+def _code_to_status(column):
+    """CASE mapping a status code back to its name, as SQLEnum stores it."""
+    whens = " ".join(f"WHEN {code} THEN '{name}'" for name, code in STATUS_CODES.items())
+    return f"CASE {column} {whens} END"
+
+
+def _decompressed_rows(column):
+    """Every non-NULL value of a ZstdText column as text, with its run id."""
+    dctx = zstandard.ZstdDecompressor()
+    rows = []
+    for run_id, value in op.get_bind().execute(
+        sa.text(f"SELECT id, {column} FROM runs WHERE {column} IS NOT NULL")
+    ):
+        if not isinstance(value, str):
+            value = bytes(value)
+            if value.startswith(ZSTD_MAGIC):
+                value = dctx.decompress(value)
+            value = value.decode('utf-8')
+        rows.append({'run_id': run_id, 'value': value})
+    return rows
+
+
+def _write_rows(column, rows):
+    if rows:
+        op.get_bind().execute(
+            sa.text(f"UPDATE runs SET {column} = :value WHERE id = :run_id"), rows
+        )
+
+
+def _hash_rows():
+    """Every hex snapshot_hash (SQLite) as 16 raw bytes, with its run id."""
+    return [
+        {'run_id': run_id, 'value': bytes.fromhex(value[:2 * DIGEST_SIZE])}
+        for run_id, value in op.get_bind().execute(sa.text(
+            "SELECT id, snapshot_hash FROM runs WHERE typeof(snapshot_hash) = 'text'"
+        ))
+    ]
+
+
+def upgrade():
+    """Apply migration."""
+    
+    if op.get_bind().dialect.name == 'postgresql':
+        # The column is a runstatus ENUM (create_all) or VARCHAR (revision 002);
+        # the old default cannot be cast, so it is swapped around the retype
+        op.alter_column('runs', 'status', server_default=None)
+        op.alter_column(
+            'runs', 'status',
+            type_=sa.SmallInteger(),
+            existing_nullable=False,
+            postgresql_using=_status_to_code('status::text'),
+        )
+        op.alter_column('runs', 'status', server_default='0')
+        op.execute("DROP TYPE IF EXISTS runstatus")
+        
+        for column in ZSTD_COLUMNS:
+            op.alter_column(
+                'runs', column,
+                type_=sa.LargeBinary(),
+                postgresql_using=f"convert_to({column}, 'UTF8')",
+            )
+        
+        op.alter_column(
+            'runs', 'snapshot_hash',
+            type_=sa.LargeBinary(DIGEST_SIZE),
+            postgresql_using=f"decode(left(snapshot_hash, {2 * DIGEST_SIZE}), 'hex')",
+        )
+    else:
+        # SQLite stores integers in a VARCHAR column as they are, so the codes
+        # are written first and the rebuild only changes the declared type.
+        # The same rebuild copies the TEXT columns with CAST(... AS BLOB).
+        # Hashes are decoded here (unhex() needs SQLite 3.41), so the rebuild
+        # copies them as they are
+        op.execute(f"UPDATE runs SET status = {_status_to_code('status')}")
+        _write_rows('snapshot_hash', _hash_rows())
+        with op.batch_alter_table('runs', recreate='auto') as batch_op:
+            batch_op.alter_column(
+                'status',
+                existing_type=sa.String(50),
+                type_=sa.SmallInteger(),
+                existing_nullable=False,
+                server_default='0',
+            )
+            for column in ZSTD_COLUMNS:
+                batch_op.alter_column(column, existing_type=sa.Text(), type_=sa.LargeBinary())
+            batch_op.alter_column(
+                'snapshot_hash', existing_type=sa.String(64), type_=sa.LargeBinary(DIGEST_SIZE)
+            )
+
+
+def downgrade():
+    """Revert migration."""
+    
+    # Compressed rows can only be decompressed here, not in SQL
+    texts = {column: _decompressed_rows(column) for column in ZSTD_COLUMNS}
+    
+    if op.get_bind().dialect.name == 'postgresql':
+        op.alter_column('runs', 'status', server_default=None)
+        op.alter_column(
+            'runs', 'status',
+            type_=sa.String(50),
+            existing_nullable=False,
+            postgresql_using=_code_to_status('status'),
+        )
+        op.alter_column('runs', 'status', server_default='queued')
+        
+        for column in ZSTD_COLUMNS:
+            op.alter_column('runs', column, type_=sa.Text(), postgresql_using='NULL')
+            _write_rows(column, texts[column])
+        
+        op.alter_column(
+            'runs', 'snapshot_hash',
+            type_=sa.String(64),
+            postgresql_using="encode(snapshot_hash, 'hex')",
+        )
+    else:
+        # SQLite takes the text into the BLOB columns before the rebuild
+        op.execute(f"UPDATE runs SET status = {_code_to_status('status')}")
+        for column in ZSTD_COLUMNS:
+            _write_rows(column, texts[column])
+        op.execute("UPDATE runs SET snapshot_hash = lower(hex(snapshot_hash)) WHERE typeof(snapshot_hash) = 'blob'")
+        with op.batch_alter_table('runs', recreate='auto') as batch_op:
+            batch_op.alter_column(
+                'status',
+                existing_type=sa.SmallInteger(),
+                type_=sa.String(50),
+                existing_nullable=False,
+                server_default='queued',
+            )
+            for column in ZSTD_COLUMNS:
+                batch_op.alter_column(column, existing_type=sa.LargeBinary(), type_=sa.Text())
+            batch_op.alter_column(
+                'snapshot_hash', existing_type=sa.LargeBinary(DIGEST_SIZE), type_=sa.String(64)
+            )
@@ -1,25 +1,79 @@
 #!/usr/bin/env python
+"""
+Probe the Ollama endpoint through instructor with concurrent requests.
+
+Fires N structured completions at once over one HTTP/2 connection pool (the
+same setup as app/services/ai_proxy.py) and prints latency percentiles.
+
+Run with: python test_instructor.py [N]
+"""
+import asyncio
 import os
+import statistics
 import sys
+import time
 
 # Set environment variable before importing
 os.environ['OLLAMA_BASE_URL'] = 'https://chatucy.cs.ucy.ac.cy/ollama/v1'
 
+import httpx
 import instructor
+from openai import AsyncOpenAI
+from pydantic import BaseModel
+
+REQUESTS = int(sys.argv[1]) if len(sys.argv) > 1 else 8
 
-print(f'OLLAMA_BASE_URL env: {os.getenv("OLLAMA_BASE_URL")}')
 
-try:
-    client = instructor.from_provider(
-        'ollama/mistral',
-        mode=instructor.Mode.JSON,
-        async_client=True,
-        client_kwargs={'verify': False}
+class PingModel(BaseModel):
+    reply: str
+
+
+async def timed_ping(client) -> float:
+    """One structured completion; returns its latency in seconds."""
+    start = time.perf_counter()
+    await client.chat.completions.create(
+        model='mistral',
+        messages=[{'role': 'user', 'content': 'ping'}],
+        response_model=PingModel,
     )
-    print(f'Client created successfully')
-    print(f'Client base_url: {client.base_url}')
-    print(f'Client api_key: {client.api_key}')
-except Exception as e:
-    print(f'Error: {type(e).__name__}: {e}')
-    import traceback
-    traceback.print_exc()
+    return time.perf_counter() - start
+
+
+async def main():
+    print(f'OLLAMA_BASE_URL env: {os.getenv("OLLAMA_BASE_URL")}')
+
+    # HTTP/2 multiplexes every request over one TLS connection
+    async with httpx.AsyncClient(
+        verify=False,
+        http2=True,
+        limits=httpx.Limits(max_connections=16, max_keepalive_connections=16),
+        timeout=httpx.Timeout(120.0, connect=5.0),
+    ) as http_client:
+        client = instructor.patch(
+            AsyncOpenAI(
+                base_url=os.environ['OLLAMA_BASE_URL'],
+                api_key='ollama',
+                http_client=http_client,
+            ),
+            mode=instructor.Mode.JSON,
+        )
+        print(f'Client base_url: {client.base_url}')
+        print(f'Sending {REQUESTS} concurrent requests...')
+
+        start = time.perf_counter()
+        latencies = sorted(await asyncio.gather(*(timed_ping(client) for _ in range(REQUESTS))))
+        total = time.perf_counter() - start
+
+    p99_index = min(len(latencies) - 1, round(0.99 * (len(latencies) - 1)))
+    print(f'Total wall time: {total:.2f}s')
+    print(f'p50 latency: {statistics.median(latencies):.2f}s')
+    print(f'p99 latency: {latencies[p99_index]:.2f}s')
+
+
+if __name__ == '__main__':
+    try:
+        asyncio.run(main())
+    except Exception as e:
+        print(f'Error: {type(e).__name__}: {e}')
+        import traceback
+        traceback.print_exc()